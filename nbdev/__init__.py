@@ -1,5 +1,14 @@
 __version__ = "2.3.13"
 
-from .doclinks import nbdev_export
-from .showdoc import show_doc
+# Names for `from nbdev import *`, which are loaded by `__getattr__`
+__all__ = ['nbdev_export', 'show_doc']
 
+def __getattr__(name):
+    # Loaded on first use, so that importing a submodule (such as for a console script) doesn't import everything
+    if name=='nbdev_export':
+        from .doclinks import nbdev_export
+        return nbdev_export
+    if name=='show_doc':
+        from .showdoc import show_doc
+        return show_doc
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,8 +9,16 @@ d = { 'settings': { 'branch': 'master',
                              'nbdev.clean._clean_cell': ('api/clean.html#_clean_cell', 'nbdev/clean.py'),
                              'nbdev.clean._clean_cell_output': ('api/clean.html#_clean_cell_output', 'nbdev/clean.py'),
                              'nbdev.clean._clean_cell_output_id': ('api/clean.html#_clean_cell_output_id', 'nbdev/clean.py'),
+                             'nbdev.clean._clean_env': ('api/clean.html#_clean_env', 'nbdev/clean.py'),
+                             'nbdev.clean._clean_file': ('api/clean.html#_clean_file', 'nbdev/clean.py'),
+                             'nbdev.clean._clean_fp': ('api/clean.html#_clean_fp', 'nbdev/clean.py'),
+                             'nbdev.clean._git_filter': ('api/clean.html#_git_filter', 'nbdev/clean.py'),
                              'nbdev.clean._git_root': ('api/clean.html#_git_root', 'nbdev/clean.py'),
                              'nbdev.clean._nbdev_clean': ('api/clean.html#_nbdev_clean', 'nbdev/clean.py'),
+                             'nbdev.clean._pkt_list': ('api/clean.html#_pkt_list', 'nbdev/clean.py'),
+                             'nbdev.clean._pkt_read': ('api/clean.html#_pkt_read', 'nbdev/clean.py'),
+                             'nbdev.clean._pkt_send': ('api/clean.html#_pkt_send', 'nbdev/clean.py'),
+                             'nbdev.clean._read_clean_fps': ('api/clean.html#_read_clean_fps', 'nbdev/clean.py'),
                              'nbdev.clean._reconfigure': ('api/clean.html#_reconfigure', 'nbdev/clean.py'),
                              'nbdev.clean._skip_or_sub': ('api/clean.html#_skip_or_sub', 'nbdev/clean.py'),
                              'nbdev.clean.clean_jupyter': ('api/clean.html#clean_jupyter', 'nbdev/clean.py'),
@@ -19,13 +27,16 @@ d = { 'settings': { 'branch': 'master',
                              'nbdev.clean.nbdev_install_hooks': ('api/clean.html#nbdev_install_hooks', 'nbdev/clean.py'),
                              'nbdev.clean.nbdev_trust': ('api/clean.html#nbdev_trust', 'nbdev/clean.py'),
                              'nbdev.clean.process_write': ('api/clean.html#process_write', 'nbdev/clean.py')},
-            'nbdev.cli': { 'nbdev.cli._render_nb': ('api/cli.html#_render_nb', 'nbdev/cli.py'),
+            'nbdev.cli': { 'nbdev.cli.__getattr__': ('api/cli.html#__getattr__', 'nbdev/cli.py'),
+                           'nbdev.cli._exporter': ('api/cli.html#_exporter', 'nbdev/cli.py'),
+                           'nbdev.cli._render_nb': ('api/cli.html#_render_nb', 'nbdev/cli.py'),
                            'nbdev.cli._update_repo_meta': ('api/cli.html#_update_repo_meta', 'nbdev/cli.py'),
                            'nbdev.cli.chelp': ('api/cli.html#chelp', 'nbdev/cli.py'),
                            'nbdev.cli.extract_tgz': ('api/cli.html#extract_tgz', 'nbdev/cli.py'),
                            'nbdev.cli.nbdev_filter': ('api/cli.html#nbdev_filter', 'nbdev/cli.py'),
                            'nbdev.cli.nbdev_new': ('api/cli.html#nbdev_new', 'nbdev/cli.py')},
-            'nbdev.config': { 'nbdev.config._apply_defaults': ('api/config.html#_apply_defaults', 'nbdev/config.py'),
+            'nbdev.config': { 'nbdev.config._anno': ('api/config.html#_anno', 'nbdev/config.py'),
+                              'nbdev.config._apply_defaults': ('api/config.html#_apply_defaults', 'nbdev/config.py'),
                               'nbdev.config._basic_export_nb': ('api/config.html#_basic_export_nb', 'nbdev/config.py'),
                               'nbdev.config._cfg2txt': ('api/config.html#_cfg2txt', 'nbdev/config.py'),
                               'nbdev.config._fetch_from_git': ('api/config.html#_fetch_from_git', 'nbdev/config.py'),
@@ -37,6 +48,7 @@ d = { 'settings': { 'branch': 'master',
                               'nbdev.config._type': ('api/config.html#_type', 'nbdev/config.py'),
                               'nbdev.config._xdg_config_paths': ('api/config.html#_xdg_config_paths', 'nbdev/config.py'),
                               'nbdev.config.add_init': ('api/config.html#add_init', 'nbdev/config.py'),
+                              'nbdev.config.cache_path': ('api/config.html#cache_path', 'nbdev/config.py'),
                               'nbdev.config.config_key': ('api/config.html#config_key', 'nbdev/config.py'),
                               'nbdev.config.create_output': ('api/config.html#create_output', 'nbdev/config.py'),
                               'nbdev.config.get_config': ('api/config.html#get_config', 'nbdev/config.py'),
@@ -54,16 +66,34 @@ d = { 'settings': { 'branch': 'master',
                                 'nbdev.doclinks.NbdevLookup.link_line': ('api/doclinks.html#nbdevlookup.link_line', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks.NbdevLookup.linkify': ('api/doclinks.html#nbdevlookup.linkify', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks._binop_leafs': ('api/doclinks.html#_binop_leafs', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._build_lookup_index': ('api/doclinks.html#_build_lookup_index', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks._build_modidx': ('api/doclinks.html#_build_modidx', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._export_env': ('api/doclinks.html#_export_env', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._export_key': ('api/doclinks.html#_export_key', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks._find_mod': ('api/doclinks.html#_find_mod', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks._get_exps': ('api/doclinks.html#_get_exps', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks._get_modidx': ('api/doclinks.html#_get_modidx', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._hash_file': ('api/doclinks.html#_hash_file', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._imp_mods': ('api/doclinks.html#_imp_mods', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks._iter_py_cells': ('api/doclinks.html#_iter_py_cells', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._lib_deps': ('api/doclinks.html#_lib_deps', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._lib_file': ('api/doclinks.html#_lib_file', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks._lineno': ('api/doclinks.html#_lineno', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._lookup_index': ('api/doclinks.html#_lookup_index', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._lookup_key': ('api/doclinks.html#_lookup_key', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._lookup_path': ('api/doclinks.html#_lookup_path', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._mod_fn': ('api/doclinks.html#_mod_fn', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._mtime': ('api/doclinks.html#_mtime', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._nbdev_eps': ('api/doclinks.html#_nbdev_eps', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks._nbpath2html': ('api/doclinks.html#_nbpath2html', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._parse_lib_file': ('api/doclinks.html#_parse_lib_file', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._py_fp': ('api/doclinks.html#_py_fp', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks._qual_mod': ('api/doclinks.html#_qual_mod', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks._qual_sym': ('api/doclinks.html#_qual_sym', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks._qual_syms': ('api/doclinks.html#_qual_syms', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._read_fps': ('api/doclinks.html#_read_fps', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._read_manifest': ('api/doclinks.html#_read_manifest', 'nbdev/doclinks.py'),
+                                'nbdev.doclinks._stale_nbs': ('api/doclinks.html#_stale_nbs', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks._sym_nm': ('api/doclinks.html#_sym_nm', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks.nbdev_export': ('api/doclinks.html#nbdev_export', 'nbdev/doclinks.py'),
                                 'nbdev.doclinks.nbglob': ('api/doclinks.html#nbglob', 'nbdev/doclinks.py'),
@@ -75,8 +105,10 @@ d = { 'settings': { 'branch': 'master',
                               'nbdev.export.ExportModuleProc._export_': ('api/export.html#exportmoduleproc._export_', 'nbdev/export.py'),
                               'nbdev.export.ExportModuleProc._exporti_': ('api/export.html#exportmoduleproc._exporti_', 'nbdev/export.py'),
                               'nbdev.export.ExportModuleProc.begin': ('api/export.html#exportmoduleproc.begin', 'nbdev/export.py'),
+                              'nbdev.export._export_parts': ('api/export.html#_export_parts', 'nbdev/export.py'),
                               'nbdev.export.black_format': ('api/export.html#black_format', 'nbdev/export.py'),
                               'nbdev.export.nb_export': ('api/export.html#nb_export', 'nbdev/export.py'),
+                              'nbdev.export.nbs_export': ('api/export.html#nbs_export', 'nbdev/export.py'),
                               'nbdev.export.optional_procs': ('api/export.html#optional_procs', 'nbdev/export.py'),
                               'nbdev.export.scrub_magics': ('api/export.html#scrub_magics', 'nbdev/export.py')},
             'nbdev.extract_attachments': {},
@@ -96,11 +128,12 @@ d = { 'settings': { 'branch': 'master',
             'nbdev.imports': {},
             'nbdev.maker': { 'nbdev.maker.ModuleMaker': ('api/maker.html#modulemaker', 'nbdev/maker.py'),
                              'nbdev.maker.ModuleMaker.__init__': ('api/maker.html#modulemaker.__init__', 'nbdev/maker.py'),
+                             'nbdev.maker.ModuleMaker._append_code': ('api/maker.html#modulemaker._append_code', 'nbdev/maker.py'),
                              'nbdev.maker.ModuleMaker._last_future': ('api/maker.html#modulemaker._last_future', 'nbdev/maker.py'),
-                             'nbdev.maker.ModuleMaker._make_exists': ('api/maker.html#modulemaker._make_exists', 'nbdev/maker.py'),
                              'nbdev.maker.ModuleMaker._update_all': ('api/maker.html#modulemaker._update_all', 'nbdev/maker.py'),
                              'nbdev.maker.ModuleMaker.make': ('api/maker.html#modulemaker.make', 'nbdev/maker.py'),
                              'nbdev.maker.ModuleMaker.make_all': ('api/maker.html#modulemaker.make_all', 'nbdev/maker.py'),
+                             'nbdev.maker.ModuleMaker.make_code': ('api/maker.html#modulemaker.make_code', 'nbdev/maker.py'),
                              'nbdev.maker.NbCell.import2relative': ('api/maker.html#nbcell.import2relative', 'nbdev/maker.py'),
                              'nbdev.maker._all_targets': ('api/maker.html#_all_targets', 'nbdev/maker.py'),
                              'nbdev.maker._basic_export_nb2': ('api/maker.html#_basic_export_nb2', 'nbdev/maker.py'),
@@ -111,9 +144,12 @@ d = { 'settings': { 'branch': 'master',
                              'nbdev.maker._targets': ('api/maker.html#_targets', 'nbdev/maker.py'),
                              'nbdev.maker._val_or_id': ('api/maker.html#_val_or_id', 'nbdev/maker.py'),
                              'nbdev.maker._wants': ('api/maker.html#_wants', 'nbdev/maker.py'),
+                             'nbdev.maker._write_changed': ('api/maker.html#_write_changed', 'nbdev/maker.py'),
+                             'nbdev.maker.cell_ast': ('api/maker.html#cell_ast', 'nbdev/maker.py'),
                              'nbdev.maker.decor_id': ('api/maker.html#decor_id', 'nbdev/maker.py'),
                              'nbdev.maker.find_var': ('api/maker.html#find_var', 'nbdev/maker.py'),
                              'nbdev.maker.make_code_cells': ('api/maker.html#make_code_cells', 'nbdev/maker.py'),
+                             'nbdev.maker.parse_cache_info': ('api/maker.html#parse_cache_info', 'nbdev/maker.py'),
                              'nbdev.maker.read_var': ('api/maker.html#read_var', 'nbdev/maker.py'),
                              'nbdev.maker.relative_import': ('api/maker.html#relative_import', 'nbdev/maker.py'),
                              'nbdev.maker.update_import': ('api/maker.html#update_import', 'nbdev/maker.py'),
@@ -153,28 +189,73 @@ d = { 'settings': { 'branch': 'master',
                                'nbdev.migrate.nbdev_migrate': ('api/migrate.html#nbdev_migrate', 'nbdev/migrate.py')},
             'nbdev.process': { 'nbdev.process.NBProcessor': ('api/process.html#nbprocessor', 'nbdev/process.py'),
                                'nbdev.process.NBProcessor.__init__': ('api/process.html#nbprocessor.__init__', 'nbdev/process.py'),
+                               'nbdev.process.NBProcessor._compact': ('api/process.html#nbprocessor._compact', 'nbdev/process.py'),
+                               'nbdev.process.NBProcessor._groups': ('api/process.html#nbprocessor._groups', 'nbdev/process.py'),
+                               'nbdev.process.NBProcessor._index': ('api/process.html#nbprocessor._index', 'nbdev/process.py'),
                                'nbdev.process.NBProcessor._proc': ('api/process.html#nbprocessor._proc', 'nbdev/process.py'),
                                'nbdev.process.NBProcessor._process_cell': ( 'api/process.html#nbprocessor._process_cell',
                                                                             'nbdev/process.py'),
                                'nbdev.process.NBProcessor._process_comment': ( 'api/process.html#nbprocessor._process_comment',
                                                                                'nbdev/process.py'),
+                               'nbdev.process.NBProcessor._procs': ('api/process.html#nbprocessor._procs', 'nbdev/process.py'),
                                'nbdev.process.NBProcessor.process': ('api/process.html#nbprocessor.process', 'nbdev/process.py'),
+                               'nbdev.process.NbBlob': ('api/process.html#nbblob', 'nbdev/process.py'),
+                               'nbdev.process.NbBlob.__init__': ('api/process.html#nbblob.__init__', 'nbdev/process.py'),
+                               'nbdev.process.NbBlob.__len__': ('api/process.html#nbblob.__len__', 'nbdev/process.py'),
+                               'nbdev.process.NbBlob.__reduce__': ('api/process.html#nbblob.__reduce__', 'nbdev/process.py'),
+                               'nbdev.process.NbBlob.__repr__': ('api/process.html#nbblob.__repr__', 'nbdev/process.py'),
+                               'nbdev.process.NbBlob.__str__': ('api/process.html#nbblob.__str__', 'nbdev/process.py'),
+                               'nbdev.process.NbBlob.chunks': ('api/process.html#nbblob.chunks', 'nbdev/process.py'),
+                               'nbdev.process.NbBlob.rstrip': ('api/process.html#nbblob.rstrip', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy': ('api/process.html#nblazy', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy.__bool__': ('api/process.html#nblazy.__bool__', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy.__delitem__': ('api/process.html#nblazy.__delitem__', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy.__eq__': ('api/process.html#nblazy.__eq__', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy.__getattr__': ('api/process.html#nblazy.__getattr__', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy.__getitem__': ('api/process.html#nblazy.__getitem__', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy.__init__': ('api/process.html#nblazy.__init__', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy.__iter__': ('api/process.html#nblazy.__iter__', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy.__len__': ('api/process.html#nblazy.__len__', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy.__reduce__': ('api/process.html#nblazy.__reduce__', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy.__repr__': ('api/process.html#nblazy.__repr__', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy.__setitem__': ('api/process.html#nblazy.__setitem__', 'nbdev/process.py'),
+                               'nbdev.process.NbLazy.value': ('api/process.html#nblazy.value', 'nbdev/process.py'),
                                'nbdev.process.Processor': ('api/process.html#processor', 'nbdev/process.py'),
                                'nbdev.process.Processor.__call__': ('api/process.html#processor.__call__', 'nbdev/process.py'),
                                'nbdev.process.Processor.__init__': ('api/process.html#processor.__init__', 'nbdev/process.py'),
+                               'nbdev.process.Processor._visits_cells': ('api/process.html#processor._visits_cells', 'nbdev/process.py'),
                                'nbdev.process.Processor.cell': ('api/process.html#processor.cell', 'nbdev/process.py'),
+                               'nbdev.process._DirParser': ('api/process.html#_dirparser', 'nbdev/process.py'),
+                               'nbdev.process._DirParser.__init__': ('api/process.html#_dirparser.__init__', 'nbdev/process.py'),
+                               'nbdev.process._DirParser.directive': ('api/process.html#_dirparser.directive', 'nbdev/process.py'),
+                               'nbdev.process._DirParser.first_code': ('api/process.html#_dirparser.first_code', 'nbdev/process.py'),
+                               'nbdev.process._DirParser.norm_quarto': ('api/process.html#_dirparser.norm_quarto', 'nbdev/process.py'),
+                               'nbdev.process._DirParser.partition': ('api/process.html#_dirparser.partition', 'nbdev/process.py'),
+                               'nbdev.process._dir_methods': ('api/process.html#_dir_methods', 'nbdev/process.py'),
+                               'nbdev.process._dir_parser': ('api/process.html#_dir_parser', 'nbdev/process.py'),
                                'nbdev.process._dir_pre': ('api/process.html#_dir_pre', 'nbdev/process.py'),
                                'nbdev.process._directive': ('api/process.html#_directive', 'nbdev/process.py'),
+                               'nbdev.process._fusable': ('api/process.html#_fusable', 'nbdev/process.py'),
+                               'nbdev.process._has_hooks': ('api/process.html#_has_hooks', 'nbdev/process.py'),
                                'nbdev.process._is_direc': ('api/process.html#_is_direc', 'nbdev/process.py'),
+                               'nbdev.process._json_end': ('api/process.html#_json_end', 'nbdev/process.py'),
+                               'nbdev.process._loads_nb': ('api/process.html#_loads_nb', 'nbdev/process.py'),
                                'nbdev.process._mk_procs': ('api/process.html#_mk_procs', 'nbdev/process.py'),
+                               'nbdev.process._nb_chunks': ('api/process.html#_nb_chunks', 'nbdev/process.py'),
                                'nbdev.process._norm_quarto': ('api/process.html#_norm_quarto', 'nbdev/process.py'),
                                'nbdev.process._partition_cell': ('api/process.html#_partition_cell', 'nbdev/process.py'),
+                               'nbdev.process._per_cell': ('api/process.html#_per_cell', 'nbdev/process.py'),
                                'nbdev.process._quarto_re': ('api/process.html#_quarto_re', 'nbdev/process.py'),
+                               'nbdev.process._read_buf': ('api/process.html#_read_buf', 'nbdev/process.py'),
+                               'nbdev.process._str_end': ('api/process.html#_str_end', 'nbdev/process.py'),
                                'nbdev.process.extract_directives': ('api/process.html#extract_directives', 'nbdev/process.py'),
                                'nbdev.process.first_code_ln': ('api/process.html#first_code_ln', 'nbdev/process.py'),
                                'nbdev.process.instantiate': ('api/process.html#instantiate', 'nbdev/process.py'),
                                'nbdev.process.nb_lang': ('api/process.html#nb_lang', 'nbdev/process.py'),
-                               'nbdev.process.opt_set': ('api/process.html#opt_set', 'nbdev/process.py')},
+                               'nbdev.process.opt_set': ('api/process.html#opt_set', 'nbdev/process.py'),
+                               'nbdev.process.read_nb_lazy': ('api/process.html#read_nb_lazy', 'nbdev/process.py'),
+                               'nbdev.process.read_nb_stream': ('api/process.html#read_nb_stream', 'nbdev/process.py'),
+                               'nbdev.process.write_nb_stream': ('api/process.html#write_nb_stream', 'nbdev/process.py')},
             'nbdev.processors': { 'nbdev.processors.FilterDefaults': ('api/processors.html#filterdefaults', 'nbdev/processors.py'),
                                   'nbdev.processors.FilterDefaults.__call__': ( 'api/processors.html#filterdefaults.__call__',
                                                                                 'nbdev/processors.py'),
@@ -196,7 +277,9 @@ d = { 'settings': { 'branch': 'master',
                                   'nbdev.processors._is_showdoc': ('api/processors.html#_is_showdoc', 'nbdev/processors.py'),
                                   'nbdev.processors._re_hideline': ('api/processors.html#_re_hideline', 'nbdev/processors.py'),
                                   'nbdev.processors._show_docs': ('api/processors.html#_show_docs', 'nbdev/processors.py'),
+                                  'nbdev.processors._showdoc_key': ('api/processors.html#_showdoc_key', 'nbdev/processors.py'),
                                   'nbdev.processors._want_doc': ('api/processors.html#_want_doc', 'nbdev/processors.py'),
+                                  'nbdev.processors._warm_shell': ('api/processors.html#_warm_shell', 'nbdev/processors.py'),
                                   'nbdev.processors.add_links': ('api/processors.html#add_links', 'nbdev/processors.py'),
                                   'nbdev.processors.add_show_docs': ('api/processors.html#add_show_docs', 'nbdev/processors.py'),
                                   'nbdev.processors.add_show_docs.begin': ( 'api/processors.html#add_show_docs.begin',
@@ -291,8 +374,18 @@ d = { 'settings': { 'branch': 'master',
                                'nbdev.release.release_pypi': ('api/release.html#release_pypi', 'nbdev/release.py'),
                                'nbdev.release.write_conda_meta': ('api/release.html#write_conda_meta', 'nbdev/release.py'),
                                'nbdev.release.write_requirements': ('api/release.html#write_requirements', 'nbdev/release.py')},
-            'nbdev.serve': { 'nbdev.serve._is_qpy': ('api/serve.html#_is_qpy', 'nbdev/serve.py'),
+            'nbdev.serve': { 'nbdev.serve._ProcDeps': ('api/serve.html#_procdeps', 'nbdev/serve.py'),
+                             'nbdev.serve._ProcDeps.__init__': ('api/serve.html#_procdeps.__init__', 'nbdev/serve.py'),
+                             'nbdev.serve._ProcDeps._fp': ('api/serve.html#_procdeps._fp', 'nbdev/serve.py'),
+                             'nbdev.serve._ProcDeps._hash': ('api/serve.html#_procdeps._hash', 'nbdev/serve.py'),
+                             'nbdev.serve._ProcDeps.deps': ('api/serve.html#_procdeps.deps', 'nbdev/serve.py'),
+                             'nbdev.serve._ProcDeps.fresh': ('api/serve.html#_procdeps.fresh', 'nbdev/serve.py'),
+                             'nbdev.serve._ProcDeps.save': ('api/serve.html#_procdeps.save', 'nbdev/serve.py'),
+                             'nbdev.serve._cfg_version': ('api/serve.html#_cfg_version', 'nbdev/serve.py'),
+                             'nbdev.serve._is_qpy': ('api/serve.html#_is_qpy', 'nbdev/serve.py'),
                              'nbdev.serve._proc_file': ('api/serve.html#_proc_file', 'nbdev/serve.py'),
+                             'nbdev.serve._procs_version': ('api/serve.html#_procs_version', 'nbdev/serve.py'),
+                             'nbdev.serve._report_caches': ('api/serve.html#_report_caches', 'nbdev/serve.py'),
                              'nbdev.serve.proc_nbs': ('api/serve.html#proc_nbs', 'nbdev/serve.py')},
             'nbdev.serve_drv': {},
             'nbdev.showdoc': { 'nbdev.showdoc.BasicHtmlRenderer': ('api/showdoc.html#basichtmlrenderer', 'nbdev/showdoc.py'),
@@ -342,6 +435,47 @@ d = { 'settings': { 'branch': 'master',
                             'nbdev.sync._update_nb': ('api/sync.html#_update_nb', 'nbdev/sync.py'),
                             'nbdev.sync.absolute_import': ('api/sync.html#absolute_import', 'nbdev/sync.py'),
                             'nbdev.sync.nbdev_update': ('api/sync.html#nbdev_update', 'nbdev/sync.py')},
-            'nbdev.test': { 'nbdev.test._keep_file': ('api/test.html#_keep_file', 'nbdev/test.py'),
+            'nbdev.test': { 'nbdev.test._Results': ('api/test.html#_results', 'nbdev/test.py'),
+                            'nbdev.test._Results.__init__': ('api/test.html#_results.__init__', 'nbdev/test.py'),
+                            'nbdev.test._Results._junit': ('api/test.html#_results._junit', 'nbdev/test.py'),
+                            'nbdev.test._Results._write': ('api/test.html#_results._write', 'nbdev/test.py'),
+                            'nbdev.test._Results.add': ('api/test.html#_results.add', 'nbdev/test.py'),
+                            'nbdev.test._Results.close': ('api/test.html#_results.close', 'nbdev/test.py'),
+                            'nbdev.test._affected': ('api/test.html#_affected', 'nbdev/test.py'),
+                            'nbdev.test._cell_growth': ('api/test.html#_cell_growth', 'nbdev/test.py'),
+                            'nbdev.test._collect': ('api/test.html#_collect', 'nbdev/test.py'),
+                            'nbdev.test._file_digest': ('api/test.html#_file_digest', 'nbdev/test.py'),
+                            'nbdev.test._git_changed': ('api/test.html#_git_changed', 'nbdev/test.py'),
+                            'nbdev.test._hist_times': ('api/test.html#_hist_times', 'nbdev/test.py'),
+                            'nbdev.test._init_worker': ('api/test.html#_init_worker', 'nbdev/test.py'),
+                            'nbdev.test._keep_file': ('api/test.html#_keep_file', 'nbdev/test.py'),
+                            'nbdev.test._limit_msg': ('api/test.html#_limit_msg', 'nbdev/test.py'),
+                            'nbdev.test._limited_child': ('api/test.html#_limited_child', 'nbdev/test.py'),
+                            'nbdev.test._merge': ('api/test.html#_merge', 'nbdev/test.py'),
+                            'nbdev.test._mod_srcs': ('api/test.html#_mod_srcs', 'nbdev/test.py'),
+                            'nbdev.test._nb_result': ('api/test.html#_nb_result', 'nbdev/test.py'),
+                            'nbdev.test._on_term': ('api/test.html#_on_term', 'nbdev/test.py'),
+                            'nbdev.test._preload': ('api/test.html#_preload', 'nbdev/test.py'),
+                            'nbdev.test._queue_dirs': ('api/test.html#_queue_dirs', 'nbdev/test.py'),
+                            'nbdev.test._queue_fail': ('api/test.html#_queue_fail', 'nbdev/test.py'),
+                            'nbdev.test._queue_run': ('api/test.html#_queue_run', 'nbdev/test.py'),
+                            'nbdev.test._read_test_cache': ('api/test.html#_read_test_cache', 'nbdev/test.py'),
+                            'nbdev.test._read_times': ('api/test.html#_read_times', 'nbdev/test.py'),
+                            'nbdev.test._record_times': ('api/test.html#_record_times', 'nbdev/test.py'),
+                            'nbdev.test._rss_mb': ('api/test.html#_rss_mb', 'nbdev/test.py'),
+                            'nbdev.test._run_units': ('api/test.html#_run_units', 'nbdev/test.py'),
+                            'nbdev.test._schedule': ('api/test.html#_schedule', 'nbdev/test.py'),
+                            'nbdev.test._segments': ('api/test.html#_segments', 'nbdev/test.py'),
+                            'nbdev.test._test_key': ('api/test.html#_test_key', 'nbdev/test.py'),
+                            'nbdev.test._test_nb_limited': ('api/test.html#_test_nb_limited', 'nbdev/test.py'),
+                            'nbdev.test._test_segments': ('api/test.html#_test_segments', 'nbdev/test.py'),
+                            'nbdev.test._test_unit': ('api/test.html#_test_unit', 'nbdev/test.py'),
+                            'nbdev.test._timing_report': ('api/test.html#_timing_report', 'nbdev/test.py'),
+                            'nbdev.test._timings_path': ('api/test.html#_timings_path', 'nbdev/test.py'),
+                            'nbdev.test._withdraw': ('api/test.html#_withdraw', 'nbdev/test.py'),
+                            'nbdev.test._write_json': ('api/test.html#_write_json', 'nbdev/test.py'),
+                            'nbdev.test._write_test_cache': ('api/test.html#_write_test_cache', 'nbdev/test.py'),
                             'nbdev.test.nbdev_test': ('api/test.html#nbdev_test', 'nbdev/test.py'),
+                            'nbdev.test.nbdev_test_report': ('api/test.html#nbdev_test_report', 'nbdev/test.py'),
+                            'nbdev.test.nbdev_test_worker': ('api/test.html#nbdev_test_worker', 'nbdev/test.py'),
                             'nbdev.test.test_nb': ('api/test.html#test_nb', 'nbdev/test.py')}}}
@@ -4,19 +4,19 @@
 __all__ = ['nbdev_trust', 'clean_nb', 'process_write', 'nbdev_clean', 'clean_jupyter', 'nbdev_install_hooks']
 
 # %% ../nbs/api/11_clean.ipynb 2
-import ast,warnings,stat
-from astunparse import unparse
+import ast,warnings,stat,json,io,contextlib
 from textwrap import indent
 
 from execnb.nbio import *
 from fastcore.script import *
 from fastcore.basics import *
 from fastcore.imports import *
+from fastcore.parallel import *
 
 from .imports import *
 from .config import *
-from .sync import *
-from .process import first_code_ln
+from .process import first_code_ln,read_nb_stream,write_nb_stream
+from . import __version__
 
 # %% ../nbs/api/11_clean.ipynb 6
 @call_parse
@@ -105,15 +105,16 @@ def _reconfigure(*strms):
 # %% ../nbs/api/11_clean.ipynb 27
 def process_write(warn_msg, proc_nb, f_in, f_out=None, disp=False):
     if not f_out: f_out = f_in
-    if isinstance(f_in, (str,Path)): f_in = Path(f_in).open(encoding="utf-8")
     try:
         _reconfigure(f_in, f_out)
-        nb = loads(f_in.read())
+        nb = read_nb_stream(f_in)
         proc_nb(nb)
-        write_nb(nb, f_out) if not disp else sys.stdout.write(nb2str(nb))
+        write_nb_stream(nb, sys.stdout if disp else f_out)
+        return True
     except Exception as e:
         warn(f'{warn_msg}')
         warn(e)
+        return False
 
 # %% ../nbs/api/11_clean.ipynb 28
 def _nbdev_clean(nb, path=None, clear_all=None):
@@ -123,23 +124,114 @@ def _nbdev_clean(nb, path=None, clear_all=None):
     allowed_cell_metadata_keys = cfg.get("allowed_cell_metadata_keys").split()
     return clean_nb(nb, clear_all, allowed_metadata_keys, allowed_cell_metadata_keys, cfg.clean_ids)
 
+def _clean_fp(fn):
+    "Fingerprint `[mtime, size]` of notebook `fn`"
+    st = Path(fn).stat()
+    return [st.st_mtime_ns, st.st_size]
+
+def _clean_env(clear_all):
+    "Everything besides a notebook itself which affects how it's cleaned"
+    cfg = get_config()
+    keys = cfg.get('allowed_metadata_keys'),cfg.get('allowed_cell_metadata_keys')
+    return repr([__version__, bool(clear_all or cfg.clear_all), *keys, cfg.clean_ids])
+
+def _read_clean_fps(env):
+    "Fingerprints of the notebooks which were clean after `nbdev_clean` last ran with settings `env`"
+    try: res = json.loads(cache_path('clean.json').read_text())
+    except (FileNotFoundError,ValueError): res = {}
+    return {k:v for k,v in res.get('files', {}).items() if Path(k).exists()} if res.get('env')==env else {}
+
+def _clean_file(fn, clear_all=False):
+    "Clean notebook `fn` in place, returning its fingerprint if that succeeded"
+    _clean = partial(_nbdev_clean, clear_all=clear_all)
+    if process_write('Failed to clean notebook', _clean, fn): return _clean_fp(fn)
+
 # %% ../nbs/api/11_clean.ipynb 29
+def _pkt_read(f):
+    "Read a git pkt-line from binary stream `f`, returning `None` for a flush packet"
+    n = f.read(4)
+    if len(n)<4: raise EOFError
+    n = int(n, 16)
+    return None if n==0 else f.read(n-4)
+
+def _pkt_list(f):
+    "Read git pkt-lines from `f` up to the next flush packet"
+    res = []
+    while True:
+        o = _pkt_read(f)
+        if o is None: return res
+        res.append(o)
+
+def _pkt_send(f, *pkts):
+    "Write `pkts` to `f` as git pkt-lines (split into the largest allowed size) followed by a flush packet"
+    for o in pkts:
+        for i in range(0, len(o), 65516): f.write(b'%04x' % (len(o[i:i+65516])+4) + o[i:i+65516])
+    f.write(b'0000')
+
+def _git_filter(clear_all=False, f_in=None, f_out=None):
+    "Clean each notebook git sends over `f_in`, using git's long-running filter process protocol"
+    f_in,f_out = f_in or sys.stdin.buffer,f_out or sys.stdout.buffer
+    hello = [o.rstrip(b'\n') for o in _pkt_list(f_in)]
+    if hello[:1]!=[b'git-filter-client'] or b'version=2' not in hello: raise ValueError(f'Unsupported git filter protocol: {hello}')
+    _pkt_send(f_out, b'git-filter-server\n', b'version=2\n')
+    caps = [o.rstrip(b'\n') for o in _pkt_list(f_in)]
+    _pkt_send(f_out, *([b'capability=clean\n'] if b'capability=clean' in caps else []))
+    f_out.flush()
+    _clean = partial(_nbdev_clean, clear_all=clear_all)
+    # Anything else printed to stdout would corrupt the protocol
+    with contextlib.redirect_stdout(sys.stderr):
+        while True:
+            try: hdr = dict(o.rstrip(b'\n').split(b'=', 1) for o in _pkt_list(f_in))
+            except EOFError: return
+            data,out = b''.join(_pkt_list(f_in)),io.StringIO()
+            fn = hdr.get(b'pathname', b'').decode()
+            if hdr.get(b'command')==b'clean' and process_write(f'Failed to clean notebook {fn}', _clean,
+                                                            io.TextIOWrapper(io.BytesIO(data), encoding='utf-8'), out):
+                _pkt_send(f_out, b'status=success\n')
+                _pkt_send(f_out, out.getvalue().encode('utf-8'))
+                _pkt_send(f_out)
+            else: _pkt_send(f_out, b'status=error\n')
+            f_out.flush()
+
+# %% ../nbs/api/11_clean.ipynb 30
 @call_parse
 def nbdev_clean(
     fname:str=None, # A notebook name or glob to clean
     clear_all:bool=False, # Remove all cell metadata and cell outputs?
     disp:bool=False,  # Print the cleaned outputs
-    stdin:bool=False # Read notebook from input stream
+    stdin:bool=False, # Read notebook from input stream
+    n_workers:int=None, # Number of workers (default: one per CPU up to 8, if there are more than 32MB of notebooks to clean)
+    force:bool=False, # Clean notebooks even if they haven't changed since they were last cleaned
+    git_filter:bool=False # Clean notebooks sent by git, as a long-running filter process
 ):
     "Clean all notebooks in `fname` to avoid merge conflicts"
     # Git hooks will pass the notebooks in stdin
     _clean = partial(_nbdev_clean, clear_all=clear_all)
     _write = partial(process_write, warn_msg='Failed to clean notebook', proc_nb=_clean)
-    if stdin: return _write(f_in=sys.stdin, f_out=sys.stdout)
+    if git_filter: return _git_filter(clear_all)
+    if stdin:
+        _write(f_in=sys.stdin, f_out=sys.stdout)
+        return
     if fname is None: fname = get_config().nbs_path
-    for f in globtastic(fname, file_glob='*.ipynb', skip_folder_re='^[_.]'): _write(f_in=f, disp=disp)
+    files = globtastic(fname, file_glob='*.ipynb', skip_folder_re='^[_.]')
+    if disp:
+        for f in files: _write(f_in=f, disp=disp)
+        return
+    cached = get_config().config_file.exists()
+    env = _clean_env(clear_all)
+    fps = _read_clean_fps(env) if cached else {}
+    keys = [str(Path(f).resolve()) for f in files]
+    todo = [(f,k) for f,k in zip(files,keys) if force or fps.get(k)!=_clean_fp(f)]
+    big = sum(_clean_fp(f)[1] for f,_ in todo)>=2**25
+    if n_workers is None: n_workers = min(num_cpus(), 8) if big and num_cpus()>1 else 0
+    res = parallel(_clean_file, [f for f,_ in todo], clear_all=clear_all, n_workers=n_workers)
+    if not cached: return
+    for (_,k),fp in zip(todo,res):
+        if fp: fps[k] = fp
+        else: fps.pop(k, None)
+    cache_path('clean.json').write_text(json.dumps(dict(env=env, files=fps)))
 
-# %% ../nbs/api/11_clean.ipynb 32
+# %% ../nbs/api/11_clean.ipynb 37
 def clean_jupyter(path, model, **kwargs):
     "Clean Jupyter `model` pre save to `path`"
     if not (model['type']=='notebook' and model['content']['nbformat']==4): return
@@ -147,7 +239,7 @@ def clean_jupyter(path, model, **kwargs):
     jupyter_hooks = get_config(path=path).jupyter_hooks
     if jupyter_hooks: _nbdev_clean(model['content'], path=path)
 
-# %% ../nbs/api/11_clean.ipynb 35
+# %% ../nbs/api/11_clean.ipynb 40
 _pre_save_hook_src = '''
 def nbdev_clean_jupyter(**kwargs):
     try: from nbdev.clean import clean_jupyter
@@ -157,8 +249,9 @@ def nbdev_clean_jupyter(**kwargs):
 c.ContentsManager.pre_save_hook = nbdev_clean_jupyter'''.strip()
 _pre_save_hook_re = re.compile(r'c\.(File)?ContentsManager\.pre_save_hook')
 
-# %% ../nbs/api/11_clean.ipynb 36
+# %% ../nbs/api/11_clean.ipynb 41
 def _add_jupyter_hooks(src, path):
+    from astunparse import unparse
     if _pre_save_hook_src in src: return
     mod = ast.parse(src)
     for node in ast.walk(mod):
@@ -175,12 +268,12 @@ def _add_jupyter_hooks(src, path):
     if src: src+='\n\n'
     return src+_pre_save_hook_src
 
-# %% ../nbs/api/11_clean.ipynb 40
+# %% ../nbs/api/11_clean.ipynb 45
 def _git_root(): 
     try: return Path(run('git rev-parse --show-toplevel'))
     except OSError: return None
 
-# %% ../nbs/api/11_clean.ipynb 43
+# %% ../nbs/api/11_clean.ipynb 48
 @call_parse
 def nbdev_install_hooks():
     "Install Jupyter and git hooks to automatically clean, trust, and fix merge conflicts in notebooks"
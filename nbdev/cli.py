@@ -6,12 +6,10 @@ import warnings
 
 from .config import *
 from .process import *
+from .process import _nb_chunks
 from .processors import *
+from .processors import _import_obj
 from .doclinks import *
-from .test import *
-from .clean import *
-from .quarto import nbdev_readme, refresh_quarto_yml
-from .frontmatter import FrontmatterProc
 
 from execnb.nbio import *
 from fastcore.meta import *
@@ -22,12 +20,28 @@ from fastcore.shutil import rmtree,move
 
 from urllib.error import HTTPError
 from contextlib import redirect_stdout
-import os, tarfile, sys
+import os, tarfile, sys, io, importlib
 
 # %% auto 0
 __all__ = ['nbdev_filter', 'extract_tgz', 'nbdev_new', 'chelp']
 
-# %% ../nbs/api/13_cli.ipynb 5
+# %% ../nbs/api/13_cli.ipynb 4
+# Names `cli` used to import from these modules, loaded on first use so that console scripts don't import them all
+_lazy_mods = dict(test='test_nb nbdev_test nbdev_test_report nbdev_test_worker',
+                  clean='nbdev_trust clean_nb process_write nbdev_clean clean_jupyter nbdev_install_hooks',
+                  quarto='nbdev_readme refresh_quarto_yml', frontmatter='FrontmatterProc')
+_lazy = {o:m for m,nms in _lazy_mods.items() for o in nms.split()}
+
+def __getattr__(name):
+    if name in _lazy: return getattr(importlib.import_module(f'nbdev.{_lazy[name]}'), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# %% ../nbs/api/13_cli.ipynb 6
+def _exporter(nm):
+    "The processor class named `nm` by the `exporter` setting: a name available from `nbdev.cli`, or `module:name`"
+    if ':' in nm: return _import_obj(nm)
+    return getattr(importlib.import_module('nbdev.cli'), nm)
+
 @call_parse
 def nbdev_filter(
     nb_txt:str=None,  # Notebook text (uses stdin if not provided)
@@ -36,26 +50,29 @@ def nbdev_filter(
 ):
     "A notebook filter for Quarto"
     os.environ["IN_TEST"] = "1"
-    try: filt = globals()[get_config().get('exporter', 'FilterDefaults')]()
+    try: filt = _exporter(get_config().get('exporter', 'FilterDefaults'))()
     except FileNotFoundError: filt = FilterDefaults()
-    if fname:        nb_txt = Path(fname).read_text()
-    elif not nb_txt: nb_txt = sys.stdin.read()
-    nb = dict2nb(loads(nb_txt))
+    if fname:    nb = read_nb_stream(fname)
+    elif nb_txt: nb = read_nb_stream(io.StringIO(nb_txt))
+    else:        nb = read_nb_stream(sys.stdin)
+    nb = dict2nb(nb)
+    # Lets `exec_show_docs` cache the notebook's outputs
+    if fname: nb['path_'] = str(fname)
     if printit:
         with open(os.devnull, 'w', encoding="utf-8") as dn:
             with redirect_stdout(dn): filt(nb)
     else: filt(nb)
-    res = nb2str(nb)
     del os.environ["IN_TEST"]
-    if printit: print(res, flush=True)
-    else: return res
+    if not printit: return ''.join(_nb_chunks(nb))
+    write_nb_stream(nb, sys.stdout)
+    print(flush=True)
 
-# %% ../nbs/api/13_cli.ipynb 8
+# %% ../nbs/api/13_cli.ipynb 10
 def extract_tgz(url, dest='.'):
     from fastcore.net import urlopen
     with urlopen(url) as u: tarfile.open(mode='r:gz', fileobj=u).extractall(dest)
 
-# %% ../nbs/api/13_cli.ipynb 9
+# %% ../nbs/api/13_cli.ipynb 11
 def _render_nb(fn, cfg):
     "Render templated values like `{{lib_name}}` in notebook at `fn` from `cfg`"
     txt = fn.read_text()
@@ -63,7 +80,7 @@ def _render_nb(fn, cfg):
     for k,v in cfg.d.items(): txt = txt.replace('{{'+k+'}}', v)
     fn.write_text(txt)
 
-# %% ../nbs/api/13_cli.ipynb 10
+# %% ../nbs/api/13_cli.ipynb 12
 def _update_repo_meta(cfg):
     "Enable gh pages and update the homepage and description in your GitHub repo."
     token=os.getenv('GITHUB_TOKEN')
@@ -74,11 +91,12 @@ def _update_repo_meta(cfg):
         except HTTPError:print(f"Could not update the description & URL on the repo: {cfg.user}/{cfg.repo} using $GITHUB_TOKEN.\n"
                   "Use a token with the correction permissions or perform these steps manually.")
 
-# %% ../nbs/api/13_cli.ipynb 11
+# %% ../nbs/api/13_cli.ipynb 13
 @call_parse
 @delegates(nbdev_create_config)
 def nbdev_new(**kwargs):
     "Create an nbdev project."
+    from nbdev.quarto import nbdev_readme, refresh_quarto_yml
     from ghapi.core import GhApi
     nbdev_create_config.__wrapped__(**kwargs)
     cfg = get_config()
@@ -108,7 +126,7 @@ def nbdev_new(**kwargs):
     nbdev_export.__wrapped__()
     nbdev_readme.__wrapped__()
 
-# %% ../nbs/api/13_cli.ipynb 15
+# %% ../nbs/api/13_cli.ipynb 17
 @call_parse
 def chelp():
     "Show help for all console scripts"
@@ -4,8 +4,8 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/api/01_config.ipynb.
 
 # %% auto 0
-__all__ = ['nbdev_create_config', 'get_config', 'config_key', 'create_output', 'show_src', 'update_version', 'add_init',
-           'write_cells']
+__all__ = ['nbdev_create_config', 'get_config', 'config_key', 'create_output', 'show_src', 'cache_path', 'update_version',
+           'add_init', 'write_cells']
 
 # %% ../nbs/api/01_config.ipynb 2
 _doc_ = """Read and write nbdev's `settings.ini` file.
@@ -20,8 +20,7 @@ from fastcore.script import *
 from fastcore.style import *
 from fastcore.xdg import *
 
-import ast
-from IPython.display import Markdown
+import ast,inspect
 from execnb.nbio import read_nb,NbCell
 from urllib.error import HTTPError
 
@@ -194,7 +193,9 @@ def _xdg_config_paths(cfg_name=_nbdev_cfg_name):
 
 # %% ../nbs/api/01_config.ipynb 27
 def _type(t): return bool if t==bool_arg else t
-_types = {k:_type(v['anno']) for k,v in docments(_apply_defaults,full=True,returns=False).items() if k != 'cfg'}
+# The same types `docments` gives, but without parsing the source of `_apply_defaults` on every import
+def _anno(p): return type(p.default) if p.annotation is p.empty and p.default is not p.empty else p.annotation
+_types = {k:_type(_anno(p)) for k,p in inspect.signature(_apply_defaults).parameters.items() if k != 'cfg'}
 
 @functools.lru_cache(maxsize=None)
 def get_config(cfg_name=_nbdev_cfg_name, path=None):
@@ -217,9 +218,24 @@ def create_output(txt, mime):
              "execution_count": 1, "metadata": {}, "output_type": "execute_result"}]
 
 # %% ../nbs/api/01_config.ipynb 45
-def show_src(src, lang='python'): return Markdown(f'```{lang}\n{src}\n```')
+def show_src(src, lang='python'):
+    from IPython.display import Markdown
+    return Markdown(f'```{lang}\n{src}\n```')
 
-# %% ../nbs/api/01_config.ipynb 48
+# %% ../nbs/api/01_config.ipynb 47
+_nbdev_cache_dir = '.nbdev_cache'
+
+def cache_path(*fns, path=None):
+    "Path to `fns` inside the project's nbdev cache folder, which is created if needed"
+    res = get_config(path=path).config_path/_nbdev_cache_dir
+    gi = res/'.gitignore'
+    if not gi.exists():
+        res.mkdir(parents=True, exist_ok=True)
+        # Like pytest's cache, keep the folder out of git without needing an entry in the project's `.gitignore`
+        gi.write_text('# Created by nbdev automatically.\n*\n')
+    return res.joinpath(*fns)
+
+# %% ../nbs/api/01_config.ipynb 51
 _re_version = re.compile('^__version__\s*=.*$', re.MULTILINE)
 _init = '__init__.py'
 
@@ -248,13 +264,13 @@ def add_init(path=None):
         if _has_py(fs) or any(filter(_has_py, subds)) and not (r/_init).exists(): (r/_init).touch()
     if get_config().get('put_version_in_init', True): update_version(path)
 
-# %% ../nbs/api/01_config.ipynb 51
+# %% ../nbs/api/01_config.ipynb 54
 def write_cells(cells, hdr, file, offset=0):
     "Write `cells` to `file` along with header `hdr` starting at index `offset` (mainly for nbdev internal use)."
     for cell in cells:
         if cell.source.strip(): file.write(f'\n\n{hdr} {cell.idx_+offset}\n{cell.source}')
 
-# %% ../nbs/api/01_config.ipynb 52
+# %% ../nbs/api/01_config.ipynb 55
 def _basic_export_nb(fname, name, dest=None):
     "Basic exporter to bootstrap nbdev."
     if dest is None: dest = get_config().lib_path
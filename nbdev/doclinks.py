@@ -5,24 +5,30 @@ __all__ = ['patch_name', 'nbglob', 'nbglob_cli', 'nbdev_export', 'NbdevLookup']
 
 # %% ../nbs/api/05_doclinks.ipynb 2
 from .config import *
+from .config import _nbdev_home_dir
 from .maker import *
+from .maker import _write_changed
 from .export import *
 from .imports import *
+from .process import extract_directives,nb_lang,read_nb_lazy
 
 from fastcore.script import *
 from fastcore.utils import *
 from fastcore.meta import delegates
+from fastcore.xdg import xdg_cache_home
+from execnb.nbio import read_nb
 
-import ast,contextlib
-import pkg_resources,importlib
-from astunparse import unparse
+import ast,contextlib,hashlib,json
+import importlib
 
 from pprint import pformat
 from urllib.parse import urljoin
 from functools import lru_cache
 
 # %% ../nbs/api/05_doclinks.ipynb 5
-def _sym_nm(klas, sym): return f'{unparse(klas).strip()}.{sym.name}'
+def _sym_nm(klas, sym):
+    from astunparse import unparse
+    return f'{unparse(klas).strip()}.{sym.name}'
 
 def _binop_leafs(bo, o):
     "List of all leaf nodes under a `BinOp`"
@@ -84,25 +90,90 @@ def _get_modidx(py_path, code_root, nbs_path):
     return {mod_name: d}
 
 # %% ../nbs/api/05_doclinks.ipynb 15
+def _hash_file(fn):
+    fn = Path(fn)
+    return hashlib.sha1(fn.read_bytes()).hexdigest() if fn.exists() else None
+
+def _read_fps(fn, env, idxfile):
+    "Load module fingerprints from `fn`, if they were created with `env` and match the current `idxfile`"
+    try: res = json.loads(Path(fn).read_text())
+    except (FileNotFoundError,ValueError): res = {}
+    if res.get('env')!=env or res.get('idx')!=_hash_file(idxfile): res = dict(env=env, files={})
+    return res
+
+def _py_fp(py_path, old):
+    "Fingerprint `[mtime, size, hash]` of `py_path`, reusing `old` if it has the same mtime and size"
+    st = py_path.stat()
+    if old and old[:2]==[st.st_mtime_ns,st.st_size]: return old
+    return [st.st_mtime_ns, st.st_size, _hash_file(py_path)]
+
 def _build_modidx(dest=None, nbs_path=None, skip_exists=False):
-    "Create _modidx.py"
+    "Create _modidx.py, re-parsing only modules which changed since it was last built"
     if dest is None: dest = get_config().lib_path
     if not Path(dest).exists(): return
     nbs_path = Path(nbs_path or get_config().nbs_path).resolve()
     if os.environ.get('IN_TEST',0): return
     idxfile = dest/'_modidx.py'
     if skip_exists and idxfile.exists(): return
-    with contextlib.suppress(FileNotFoundError): idxfile.unlink()
-    if idxfile.exists(): res = exec_local(idxfile.read_text(), 'd')
-    else: res = dict(syms={}, settings={}) 
-    res['settings'] = {k:v for k,v in get_config().d.items()
-                       if k in ('doc_host','doc_baseurl','lib_path','git_url','branch')}
     code_root = dest.parent.resolve()
+    fps_fn = cache_path('modidx.json')
+    fps = _read_fps(fps_fn, repr((str(code_root),str(nbs_path))), idxfile)
+    old = exec_local(idxfile.read_text(), 'd')['syms'] if fps['files'] else {}
+    res = dict(syms={}, settings={k:v for k,v in get_config().d.items()
+                                  if k in ('doc_host','doc_baseurl','lib_path','git_url','branch')})
+    files = {}
     for file in globtastic(dest, file_glob="*.py", skip_file_re='^_', skip_folder_re="\.ipynb_checkpoints"):
-        res['syms'].update(_get_modidx((dest.parent/file).resolve(), code_root, nbs_path=nbs_path))
-    idxfile.write_text("# Autogenerated by nbdev\n\nd = "+pformat(res, width=140, indent=2, compact=True)+'\n')
+        py_path = (dest.parent/file).resolve()
+        rel_name = py_path.relative_to(code_root).as_posix()
+        prev = fps['files'].get(rel_name)
+        files[rel_name] = fp = _py_fp(py_path, prev)
+        mod_name = '.'.join(rel_name.rpartition('.')[0].split('/'))
+        if prev and prev[2]==fp[2] and mod_name in old: res['syms'][mod_name] = old[mod_name]
+        else: res['syms'].update(_get_modidx(py_path, code_root, nbs_path=nbs_path))
+    _write_changed(idxfile, "# Autogenerated by nbdev\n\nd = "+pformat(res, width=140, indent=2, compact=True)+'\n')
+    fps_fn.write_text(json.dumps(dict(env=fps['env'], idx=_hash_file(idxfile), files=files)))
 
 # %% ../nbs/api/05_doclinks.ipynb 20
+def _imp_mods(trees, pkg=''):
+    "Modules (and their parent packages) imported anywhere in `trees`, resolving relative imports against `pkg`"
+    for node in (n for t in trees for n in ast.walk(t)):
+        if isinstance(node, ast.Import): nms = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = pkg.split('.')[:len(pkg.split('.'))+1-node.level] if node.level else []
+            mod = '.'.join(base + [node.module] if node.module else base)
+            nms = [mod] + [f'{mod}.{a.name}' for a in node.names]
+        else: continue
+        for nm in nms:
+            parts = nm.split('.')
+            for i in range(1, len(parts)+1): yield '.'.join(parts[:i])
+
+# %% ../nbs/api/05_doclinks.ipynb 21
+def _lib_file(mod, lib_path):
+    "File in `lib_path` defining module `mod`, if there is one"
+    parts = mod.split('.')
+    if parts[0]!=lib_path.name: return
+    p = lib_path.parent.joinpath(*parts)
+    return first(o for o in (p.with_suffix('.py'), p/'__init__.py') if o.exists())
+
+@lru_cache(None)
+def _parse_lib_file(f, mtime):
+    "AST of library file `f`, parsed once for each modification time"
+    return ast.parse(f.read_text()).body
+
+def _lib_deps(trees, lib_path=None):
+    "Library files imported by `trees`, directly or through other library modules"
+    lib_path = Path(lib_path or get_config().lib_path).absolute()
+    todo,res = [(trees,'')],set()
+    while todo:
+        ts,pkg = todo.pop()
+        for f in {_lib_file(m, lib_path) for m in _imp_mods(ts, pkg)}:
+            if not f or f in res: continue
+            res.add(f)
+            mod = '.'.join(f.relative_to(lib_path.parent).with_suffix('').parts)
+            todo.append((_parse_lib_file(f, os.stat(f).st_mtime_ns), mod[:-9] if f.name=='__init__.py' else mod.rpartition('.')[0]))
+    return sorted(res)
+
+# %% ../nbs/api/05_doclinks.ipynb 25
 @delegates(globtastic)
 def nbglob(path=None, skip_folder_re = '^[_.]', file_glob='*.ipynb', skip_file_re='^[_.]', key='nbs_path', as_path=False, **kwargs):
     "Find all files in a directory matching an extension given a config key."
@@ -112,7 +183,7 @@ def nbglob(path=None, skip_folder_re = '^[_.]', file_glob='*.ipynb', skip_file_r
                      skip_file_re=skip_file_re, recursive=recursive, **kwargs)
     return res.map(Path) if as_path else res
 
-# %% ../nbs/api/05_doclinks.ipynb 21
+# %% ../nbs/api/05_doclinks.ipynb 26
 def nbglob_cli(
     path:str=None, # Path to notebooks
     symlinks:bool=False, # Follow symlinks?
@@ -126,28 +197,91 @@ def nbglob_cli(
     return nbglob(path, symlinks=symlinks, file_glob=file_glob, file_re=file_re, folder_re=folder_re,
                   skip_file_glob=skip_file_glob, skip_file_re=skip_file_re, skip_folder_re=skip_folder_re)
 
-# %% ../nbs/api/05_doclinks.ipynb 22
+# %% ../nbs/api/05_doclinks.ipynb 27
+_exp_dirs = {'default_exp','export','exporti','exports'}
+
+def _export_key(fname):
+    "Hash of the exported cells and directives of notebook `fname`, along with the modules it exports to"
+    nb = read_nb_lazy(fname)
+    lang,h,mods = nb_lang(nb),hashlib.sha1(),set()
+    for cell in nb.cells:
+        if cell.cell_type!='code': continue
+        dirs = extract_directives(cell, remove=False, lang=lang)
+        if not dirs.keys() & _exp_dirs: continue
+        mods.update(v[0] for k,v in dirs.items() if k in _exp_dirs and v)
+        h.update(f'{cell.idx_}\n{cell.source}\n'.encode())
+    return h.hexdigest(),sorted(mods)
+
+# %% ../nbs/api/05_doclinks.ipynb 30
+def _export_env(procs):
+    "Hash of everything other than notebook contents that affects exported modules"
+    import nbdev
+    cfg = {k:v for k,v in get_config().d.items() if k!='version'}
+    return hashlib.sha1(repr((nbdev.__version__, sorted(cfg.items()), L(procs).attrgot('__name__'))).encode()).hexdigest()
+
+def _read_manifest(fn, env):
+    "Load the export manifest in `fn`, or an empty one if it's missing or was created with a different `env`"
+    try: res = json.loads(Path(fn).read_text())
+    except (FileNotFoundError,ValueError): res = {}
+    return res if res.get('env')==env else dict(env=env, nbs={}, mods={})
+
+def _mod_fn(mod, lib_path): return Path(lib_path)/(mod.replace('.','/')+'.py')
+
+# %% ../nbs/api/05_doclinks.ipynb 31
+def _stale_nbs(files, man, lib_path):
+    "Entries for each notebook in `files`, and the set of notebooks which need to be exported again"
+    nbs,dirty,mod_hashes = {},set(),{}
+    def _mod_hash(m):
+        if m not in mod_hashes: mod_hashes[m] = _hash_file(_mod_fn(m, lib_path))
+        return mod_hashes[m]
+    for f in files:
+        k,st = str(Path(f).resolve()),Path(f).stat()
+        old = man['nbs'].get(k)
+        if old and (old['mtime'],old['size'])==(st.st_mtime_ns,st.st_size): ent = old
+        else:
+            h,mods = _export_key(f)
+            ent = dict(mtime=st.st_mtime_ns, size=st.st_size, hash=h, mods=mods)
+        nbs[k] = ent
+        if not old or old['hash']!=ent['hash'] or any(man['mods'].get(m)!=_mod_hash(m) for m in ent['mods']): dirty.add(k)
+    # Modules can be written by more than one notebook, so all of their notebooks need to be exported together
+    while True:
+        mods = {m for k in dirty for m in nbs[k]['mods']+man['nbs'].get(k,{}).get('mods',[])}
+        new = {k for k,o in nbs.items() if k not in dirty and mods.intersection(o['mods'])}
+        if not new: return nbs,dirty
+        dirty |= new
+
+# %% ../nbs/api/05_doclinks.ipynb 32
 @call_parse
 @delegates(nbglob_cli)
 def nbdev_export(
     path:str=None, # Path or filename
     procs:Param("tokens naming the export processors to use.", nargs="*", choices=optional_procs())="black_format",
+    force:bool=False, # Export all notebooks, even if unchanged since the last export
+    n_workers:int=None, # Number of workers to process notebooks with (defaults to one per CPU, up to 8)
     **kwargs):
     "Export notebooks in `path` to Python modules"
     if os.environ.get('IN_TEST',0): return
     if procs:
       import nbdev.export
       procs = [getattr(nbdev.export, p) for p in L(procs)]
+    cfg = get_config()
     files = nbglob(path=path, as_path=True, **kwargs).sorted('name')
-    for f in files: nb_export(f, procs=procs)
-    add_init(get_config().lib_path)
+    man_fn = cache_path('export.json')
+    man = _read_manifest(man_fn, _export_env(procs))
+    if force: man['nbs'],man['mods'] = {},{}
+    nbs,dirty = _stale_nbs(files, man, cfg.lib_path)
+    nbs_export(files.filter(lambda f: str(f.resolve()) in dirty), procs=procs, n_workers=n_workers)
+    add_init(cfg.lib_path)
     _build_modidx()
+    man['nbs'].update(nbs)
+    for m in {m for k in dirty for m in nbs[k]['mods']}: man['mods'][m] = _hash_file(_mod_fn(m, cfg.lib_path))
+    man_fn.write_text(json.dumps(man))
 
-# %% ../nbs/api/05_doclinks.ipynb 25
+# %% ../nbs/api/05_doclinks.ipynb 35
 import importlib,ast
 from functools import lru_cache
 
-# %% ../nbs/api/05_doclinks.ipynb 26
+# %% ../nbs/api/05_doclinks.ipynb 36
 def _find_mod(mod):
     mp,_,mr = mod.partition('/')
     spec = importlib.util.find_spec(mp)
@@ -170,7 +304,7 @@ def _get_exps(mod):
 
 def _lineno(sym, fname): return _get_exps(fname).get(sym, None) if fname else None
 
-# %% ../nbs/api/05_doclinks.ipynb 28
+# %% ../nbs/api/05_doclinks.ipynb 38
 def _qual_sym(s, settings):
     if not isinstance(s,tuple): return s
     nb,py = s
@@ -185,10 +319,70 @@ def _qual_syms(entries):
     if 'doc_host' not in settings: return entries
     return {'syms': {mod:_qual_mod(d, settings) for mod,d in entries['syms'].items()}, 'settings':settings}
 
-# %% ../nbs/api/05_doclinks.ipynb 29
+# %% ../nbs/api/05_doclinks.ipynb 39
+def _nbdev_eps():
+    "`(name, dist, module, load)` for each `nbdev` entry point of the installed distributions"
+    try: from importlib.metadata import distributions
+    except ImportError: # Python 3.7
+        import pkg_resources
+        return [(o.name, o.dist.key, o.module_name, o.resolve) for o in pkg_resources.iter_entry_points(group='nbdev')]
+    res,seen = [],set()
+    for d in distributions():
+        dist = re.sub(r'[^A-Za-z0-9.]+', '-', d.metadata['Name'] or '').lower()
+        # As with `pkg_resources`, only the first copy of a distribution on `sys.path` is used
+        if dist in seen: continue
+        seen.add(dist)
+        res += [(o.name, dist, o.value.split(':')[0].strip(), o.load) for o in d.entry_points if o.group=='nbdev']
+    return res
+
+# %% ../nbs/api/05_doclinks.ipynb 40
+_lookup_fmt = 1 # Increment when the format of the lookup index changes
+
+def _mtime(p):
+    try: return os.stat(p).st_mtime_ns
+    except (OSError,TypeError): return None
+
+def _lookup_path():
+    "Path of the lookup index for this Python environment, in the user's nbdev cache folder"
+    h = hashlib.sha1(f'{sys.executable}\n{sys.prefix}'.encode()).hexdigest()[:16]
+    return xdg_cache_home()/_nbdev_home_dir/f'lookup-{h}.json'
+
+def _lookup_key():
+    "Changes when the index needs rebuilding, including whenever a distribution is installed, upgraded or removed"
+    import nbdev
+    return json.loads(json.dumps([nbdev.__version__, _lookup_fmt, [(p,_mtime(p)) for p in sys.path if p and os.path.isdir(p)]]))
+
+def _build_lookup_index():
+    res = {}
+    for nm,dist,mod,load in _nbdev_eps():
+        d = _qual_syms(load())
+        fn = getattr(sys.modules.get(mod), '__file__', None)
+        res[nm] = dict(dist=dist, file=fn, mtime=_mtime(fn), **d)
+    return res
+
+def _lookup_index():
+    "Symbols of each library with an `nbdev` entry point, keyed by entry point name, read from the lookup index if it's current"
+    key,p = _lookup_key(),_lookup_path()
+    try: idx = json.loads(p.read_text())
+    except (OSError,ValueError): idx = {}
+    res = idx.get('entries') if idx.get('key')==key else None
+    # Editable installs change their `_modidx.py` in place
+    if res is None or any(_mtime(o['file'])!=o['mtime'] for o in res.values()):
+        res = _build_lookup_index()
+        try:
+            p.parent.mkdir(parents=True, exist_ok=True)
+            tmp = p.with_name(f'{p.name}.{os.getpid()}.tmp')
+            tmp.write_text(json.dumps(dict(key=key, entries=res)))
+            os.replace(tmp, p)
+        except OSError: pass
+    # JSON has no tuples
+    return {nm:dict(o, syms={m:{k:tuple(v) if isinstance(v,list) else v for k,v in d.items()} for m,d in o['syms'].items()})
+            for nm,o in res.items()}
+
+# %% ../nbs/api/05_doclinks.ipynb 43
 _re_backticks = re.compile(r'`([^`\s]+)`')
 
-# %% ../nbs/api/05_doclinks.ipynb 30
+# %% ../nbs/api/05_doclinks.ipynb 44
 @lru_cache(None)
 class NbdevLookup:
     "Mapping from symbol names to docs and source URLs"
@@ -201,8 +395,8 @@ class NbdevLookup:
         strip_libs = L(strip_libs)
         if incl_libs is not None: incl_libs = (L(incl_libs)+strip_libs).unique()
         # Dict from lib name to _nbdev module for incl_libs (defaults to all)
-        self.entries = {o.name: _qual_syms(o.resolve()) for o in list(pkg_resources.iter_entry_points(group='nbdev'))
-                       if incl_libs is None or o.dist.key in incl_libs}
+        self.entries = {nm:dict(syms=o['syms'], settings=o['settings']) for nm,o in _lookup_index().items()
+                        if incl_libs is None or o['dist'] in incl_libs}
         py_syms = merge(*L(o['syms'].values() for o in self.entries.values()).concat())
         for m in strip_libs:
             if m in self.entries:
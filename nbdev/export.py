@@ -1,17 +1,19 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/api/04_export.ipynb.
 
 # %% auto 0
-__all__ = ['ExportModuleProc', 'black_format', 'scrub_magics', 'optional_procs', 'nb_export']
+__all__ = ['ExportModuleProc', 'black_format', 'scrub_magics', 'optional_procs', 'nb_export', 'nbs_export']
 
 # %% ../nbs/api/04_export.ipynb 2
 from .config import *
 from .maker import *
+from .maker import _write_changed
 from .imports import *
 from .process import *
 
 from fastcore.script import *
 from fastcore.basics import *
 from fastcore.imports import *
+from fastcore.parallel import parallel,num_cpus
 
 from collections import defaultdict
 
@@ -57,15 +59,15 @@ import nbdev.export
 def optional_procs():
     "An explicit list of processors that could be used by `nb_export`"
     return L([p for p in nbdev.export.__all__
-              if p not in ["nb_export", "ExportModuleProc", "optional_procs"]])
+              if p not in ["nb_export", "nbs_export", "ExportModuleProc", "optional_procs"]])
 
 # %% ../nbs/api/04_export.ipynb 16
-def nb_export(nbname, lib_path=None, procs=None, debug=False, mod_maker=ModuleMaker, name=None):
-    "Create module(s) from notebook"
-    if lib_path is None: lib_path = get_config().lib_path
+def _export_parts(nbname, procs=None, debug=False, name=None):
+    "Process `nbname` and return a `(module_name, cells, all_cells, is_new)` tuple for each module it exports to"
     exp = ExportModuleProc()
-    nb = NBProcessor(nbname, [exp]+L(procs), debug=debug)
+    nb = NBProcessor(nbname, [exp]+L(procs), debug=debug, lazy=True)
     nb.process()
+    res = []
     for mod,cells in exp.modules.items():
         all_cells = exp.in_all[mod]
         nm = ifnone(name, getattr(exp, 'default_exp', None) if mod=='#' else mod)
@@ -73,6 +75,35 @@ def nb_export(nbname, lib_path=None, procs=None, debug=False, mod_maker=ModuleMa
             warn(f"Notebook '{nbname}' uses `#|export` without `#|default_exp` cell.\n"
                  "Note nbdev2 no longer supports nbdev1 syntax. Run `nbdev_migrate` to upgrade.\n"
                  "See https://nbdev.fast.ai/getting_started.html for more information.")
-            return
-        mm = mod_maker(dest=lib_path, name=nm, nb_path=nbname, is_new=bool(name) or mod=='#')
+            break
+        res.append((nm, cells, all_cells, bool(name) or mod=='#'))
+    return res
+
+# %% ../nbs/api/04_export.ipynb 17
+def nb_export(nbname, lib_path=None, procs=None, debug=False, mod_maker=ModuleMaker, name=None):
+    "Create module(s) from notebook"
+    if lib_path is None: lib_path = get_config().lib_path
+    for nm,cells,all_cells,is_new in _export_parts(nbname, procs=procs, debug=debug, name=name):
+        mm = mod_maker(dest=lib_path, name=nm, nb_path=nbname, is_new=is_new)
         mm.make(cells, all_cells, lib_path=lib_path)
+
+# %% ../nbs/api/04_export.ipynb 25
+def nbs_export(nbnames, lib_path=None, procs=None, n_workers=None, mod_maker=ModuleMaker):
+    "Create module(s) from notebooks `nbnames`, processing them with `n_workers` and writing each module once"
+    if lib_path is None: lib_path = get_config().lib_path
+    nbnames = L(nbnames)
+    if n_workers is None: n_workers = min(num_cpus(), 8, len(nbnames))
+    if n_workers<2: n_workers = 0
+    res = parallel(_export_parts, nbnames, procs=procs, n_workers=n_workers)
+    mods = defaultdict(L)
+    for nbname,parts in zip(nbnames,res):
+        for nm,cells,all_cells,is_new in parts: mods[nm].append((nbname,cells,all_cells,is_new))
+    for nm,parts in mods.items():
+        code = None
+        for nbname,cells,all_cells,is_new in parts:
+            mm = mod_maker(dest=lib_path, name=nm, nb_path=nbname)
+            if is_new: code = None
+            elif code is None: code = mm.fname.read_text(encoding="utf-8")
+            code = mm.make_code(cells, all_cells, lib_path=lib_path, code=code)
+        mm.fname.parent.mkdir(exist_ok=True, parents=True)
+        _write_changed(mm.fname, code)
@@ -10,7 +10,6 @@ from .doclinks import _nbpath2html
 
 from execnb.nbio import *
 from fastcore.imports import *
-import yaml
 
 # %% ../nbs/api/09_frontmatter.ipynb 5
 _RE_FM_BASE=r'''^---\s*
@@ -24,7 +23,9 @@ def _fm2dict(s:str, nb=True):
     "Load YAML frontmatter into a `dict`"
     re_fm = _re_fm_nb if nb else _re_fm_md
     match = re_fm.search(s.strip())
-    return yaml.safe_load(match.group(1)) if match else {}
+    if not match: return {}
+    import yaml
+    return yaml.safe_load(match.group(1))
 
 def _md2dict(s:str):
     "Convert H1 formatted markdown cell to frontmatter dict"
@@ -36,12 +37,15 @@ def _md2dict(s:str):
     if m: res['description'] = m.group(1)
     r = re.findall(r'^-\s+(\S.*:.*\S)\s*$', s, flags=re.MULTILINE)
     if r:
+        import yaml
         try: res.update(yaml.safe_load('\n'.join(r)))
         except Exception as e: warn(f'Failed to create YAML dict for:\n{r}\n\n{e}\n')
     return res
 
 # %% ../nbs/api/09_frontmatter.ipynb 6
-def _dict2fm(d): return f'---\n{yaml.dump(d)}\n---\n\n'
+def _dict2fm(d):
+    import yaml
+    return f'---\n{yaml.dump(d)}\n---\n\n'
 def _insertfm(nb, fm): nb.cells.insert(0, mk_cell(_dict2fm(fm), 'raw'))
 
 class FrontmatterProc(Processor):
@@ -4,7 +4,8 @@
 from __future__ import annotations
 
 # %% auto 0
-__all__ = ['find_var', 'read_var', 'update_var', 'ModuleMaker', 'decor_id', 'make_code_cells', 'relative_import', 'update_import']
+__all__ = ['find_var', 'read_var', 'update_var', 'ModuleMaker', 'decor_id', 'cell_ast', 'parse_cache_info', 'make_code_cells',
+           'relative_import', 'update_import']
 
 # %% ../nbs/api/02_maker.ipynb 3
 from .config import *
@@ -17,7 +18,7 @@ from execnb.nbio import *
 
 import ast,contextlib
 
-from collections import defaultdict
+from collections import defaultdict,namedtuple
 from pprint import pformat
 from textwrap import TextWrapper
 
@@ -87,13 +88,36 @@ def _filt_dec(x): return decor_id(x).startswith('patch')
 def _wants(o): return isinstance(o,_def_types) and not any(L(o.decorator_list).filter(_filt_dec))
 
 # %% ../nbs/api/02_maker.ipynb 20
+_ParseInfo = namedtuple('_ParseInfo', 'hits misses')
+_parse_stats = [0,0]
+
+def cell_ast(cell):
+    "Parsed AST of `cell`'s source, kept on the cell and parsed again if its source changes"
+    if cell.cell_type!='code' or cell.source.strip()[:1] in ['%', '!']: return
+    src,res = cell.get('_ast_', (None,None))
+    if src==cell.source:
+        _parse_stats[0] += 1
+        return res
+    _parse_stats[1] += 1
+    try: res = ast.parse(cell.source).body
+    # you can assign the result of ! to a variable in a notebook cell
+    # which will result in a syntax error if parsed with the ast module.
+    except SyntaxError: res = None
+    cell['_ast_'] = (cell.source, res)
+    return res
+
+def parse_cache_info():
+    "Hits and misses of the ASTs kept by `cell_ast` in this process"
+    return _ParseInfo(*_parse_stats)
+
+# %% ../nbs/api/02_maker.ipynb 21
 def _targets(o): return [o.target] if isinstance(o, (ast.AugAssign,ast.AnnAssign)) else o.targets
 
 @patch
 def make_all(self:ModuleMaker, cells):
     "Create `__all__` with all exports in `cells`"
     if cells is None: return ''
-    trees = L(cells).map(NbCell.parsed_).concat()
+    trees = L(cells).map(cell_ast).concat()
     # include anything mentioned in "_all_", even if otherwise private
     # NB: "_all_" can include strings (names), or symbols, so we look for "id" or "value"
     assigns = trees.filter(risinstance(_assign_types))
@@ -105,10 +129,10 @@ def make_all(self:ModuleMaker, cells):
     exports = (assign_targs.attrgot('id')+syms).filter(lambda o: o and o[0]!='_')
     return (exports+all_vals).unique()
 
-# %% ../nbs/api/02_maker.ipynb 21
+# %% ../nbs/api/02_maker.ipynb 22
 def make_code_cells(*ss): return dict2nb({'cells':L(ss).map(mk_cell)}).cells
 
-# %% ../nbs/api/02_maker.ipynb 24
+# %% ../nbs/api/02_maker.ipynb 27
 def relative_import(name, fname, level=0):
     "Convert a module `name` to a name relative to `fname`"
     assert not level
@@ -120,7 +144,7 @@ def relative_import(name, fname, level=0):
     if not all(o=='.' for o in res): res='.'+res
     return res.replace(os.path.sep, ".")
 
-# %% ../nbs/api/02_maker.ipynb 26
+# %% ../nbs/api/02_maker.ipynb 29
 # Based on https://github.com/thonny/thonny/blob/master/thonny/ast_utils.py
 def _mark_text_ranges(
     source: str|bytes, # Source code to add ranges to
@@ -138,7 +162,7 @@ def _mark_text_ranges(
             child.end_lineno, child.end_col_offset = child.lineno, child.col_offset+2
     return root.body
 
-# %% ../nbs/api/02_maker.ipynb 27
+# %% ../nbs/api/02_maker.ipynb 30
 def update_import(source, tree, libname, f=relative_import):
     if not tree: return
     if sys.version_info < (3,8): tree = _mark_text_ranges(source)
@@ -155,74 +179,89 @@ def update_import(source, tree, libname, f=relative_import):
 
 @patch
 def import2relative(cell:NbCell, libname):
-    src = update_import(cell.source, cell.parsed_(), libname)
+    src = update_import(cell.source, cell_ast(cell), libname)
     if src: cell.set_source(src)
 
-# %% ../nbs/api/02_maker.ipynb 29
+# %% ../nbs/api/02_maker.ipynb 32
 @patch
 def _last_future(self:ModuleMaker, cells):
     "Returns the location of a `__future__` in `cells`"
-    trees = cells.map(NbCell.parsed_)
+    trees = cells.map(cell_ast)
     try: return max(i for i,tree in enumerate(trees) if tree and any(
          isinstance(t,ast.ImportFrom) and t.module=='__future__' for t in tree))+1
     except ValueError: return 0
 
-# %% ../nbs/api/02_maker.ipynb 30
+# %% ../nbs/api/02_maker.ipynb 33
 def _import2relative(cells, lib_name=None):
     "Converts `cells` to use `import2relative` based on `lib_name`"
     if lib_name is None: lib_name = get_config().lib_name
     for cell in cells: cell.import2relative(lib_name)
 
-# %% ../nbs/api/02_maker.ipynb 31
+# %% ../nbs/api/02_maker.ipynb 34
 def _retr_mdoc(cells):
     "Search for `_doc_` variable, used to create module docstring"
-    trees = L(cells).map(NbCell.parsed_).concat()
+    trees = L(cells).map(cell_ast).concat()
     for o in trees:
         if isinstance(o, _assign_types) and getattr(_targets(o)[0],'id',None)=='_doc_':
             v = try_attrs(o.value, 'value', 's') # py37 uses `ast.Str.s`
             return f'"""{v}"""\n\n' 
     return ""
 
-# %% ../nbs/api/02_maker.ipynb 33
+# %% ../nbs/api/02_maker.ipynb 36
+def _write_changed(fname, txt):
+    "Write `txt` to `fname`, unless it already contains exactly `txt`"
+    fname = Path(fname)
+    if fname.exists() and fname.read_text(encoding="utf-8")==txt: return False
+    with fname.open('w', encoding="utf-8") as f: f.write(txt)
+    return True
+
 @patch
-def make(self:ModuleMaker, cells, all_cells=None, lib_path=None):
-    "Write module containing `cells` with `__all__` generated from `all_cells`"
+def make_code(self:ModuleMaker, cells, all_cells=None, lib_path=None, code=None):
+    "Source of module containing `cells` (appended to `code`, if passed) with `__all__` generated from `all_cells`"
     if all_cells is None: all_cells = cells
     cells,all_cells = L(cells),L(all_cells)
     if self.parse: 
         if not lib_path: lib_path = get_config().lib_path
         mod_dir = os.path.relpath(self.fname.parent, Path(lib_path).parent)
         _import2relative(all_cells, mod_dir)
-    if not self.is_new: return self._make_exists(cells, all_cells)
+    if code is not None: return self._append_code(code, cells, all_cells)
 
-    self.fname.parent.mkdir(exist_ok=True, parents=True)
     last_future = 0
     if self.parse:
         _all = self.make_all(all_cells)
         last_future = self._last_future(cells) if len(all_cells)>0 else 0
         tw = TextWrapper(width=120, initial_indent='', subsequent_indent=' '*11, break_long_words=False)
         all_str = '\n'.join(tw.wrap(str(_all)))
-    with self.fname.open('w', encoding="utf-8") as f:
-        f.write(_retr_mdoc(cells))
-        f.write(f"# AUTOGENERATED! DO NOT EDIT! File to edit: {self.dest2nb}.")
-        if last_future > 0: write_cells(cells[:last_future], self.hdr, f)
-        if self.parse: f.write(f"\n\n# %% auto 0\n__all__ = {all_str}")
-        write_cells(cells[last_future:], self.hdr, f)
-        f.write('\n')
-
-# %% ../nbs/api/02_maker.ipynb 38
+    f = io.StringIO()
+    f.write(_retr_mdoc(cells))
+    f.write(f"# AUTOGENERATED! DO NOT EDIT! File to edit: {self.dest2nb}.")
+    if last_future > 0: write_cells(cells[:last_future], self.hdr, f)
+    if self.parse: f.write(f"\n\n# %% auto 0\n__all__ = {all_str}")
+    write_cells(cells[last_future:], self.hdr, f)
+    f.write('\n')
+    return f.getvalue()
+
+@patch
+def make(self:ModuleMaker, cells, all_cells=None, lib_path=None):
+    "Write module containing `cells` with `__all__` generated from `all_cells`"
+    code = None if self.is_new else self.fname.read_text(encoding="utf-8")
+    self.fname.parent.mkdir(exist_ok=True, parents=True)
+    _write_changed(self.fname, self.make_code(cells, all_cells, lib_path=lib_path, code=code))
+
+# %% ../nbs/api/02_maker.ipynb 43
 @patch
 def _update_all(self:ModuleMaker, all_cells, alls):
     return pformat(alls + self.make_all(all_cells), width=160)
 
 @patch
-def _make_exists(self:ModuleMaker, cells, all_cells=None):
-    "`make` for `is_new=False`"
-    if all_cells and self.parse:
-        update_var('__all__', partial(self._update_all, all_cells), fn=self.fname)
-    with self.fname.open('a', encoding="utf-8") as f: write_cells(cells, self.hdr, f)
+def _append_code(self:ModuleMaker, code, cells, all_cells=None):
+    "`make_code` for an existing module's `code`"
+    if all_cells and self.parse: code = update_var('__all__', partial(self._update_all, all_cells), code=code)
+    f = io.StringIO()
+    write_cells(cells, self.hdr, f)
+    return code+f.getvalue()
 
-# %% ../nbs/api/02_maker.ipynb 44
+# %% ../nbs/api/02_maker.ipynb 50
 def _basic_export_nb2(fname, name, dest=None):
     "A basic exporter to bootstrap nbdev using `ModuleMaker`"
     if dest is None: dest = get_config().lib_path
@@ -1,7 +1,8 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/api/03_process.ipynb.
 
 # %% auto 0
-__all__ = ['langs', 'nb_lang', 'first_code_ln', 'extract_directives', 'opt_set', 'instantiate', 'NBProcessor', 'Processor']
+__all__ = ['langs', 'nb_lang', 'first_code_ln', 'extract_directives', 'opt_set', 'instantiate', 'NBProcessor', 'Processor',
+           'NbBlob', 'NbLazy', 'read_nb_stream', 'read_nb_lazy', 'write_nb_stream']
 
 # %% ../nbs/api/03_process.ipynb 2
 from .config import *
@@ -9,10 +10,12 @@ from .maker import *
 from .imports import *
 
 from execnb.nbio import *
+from execnb.nbio import _dict2obj
 from fastcore.script import *
 from fastcore.imports import *
 
 from collections import defaultdict
+import json,mmap,filecmp,shutil
 
 # %% ../nbs/api/03_process.ipynb 6
 # from https://github.com/quarto-dev/quarto-cli/blob/main/src/resources/jupyter/notebook.py
@@ -27,108 +30,357 @@ langs = defaultdict(
 def nb_lang(nb): return nested_attr(nb, 'metadata.kernelspec.language', 'python')
 
 # %% ../nbs/api/03_process.ipynb 9
+_cell_mgc = re.compile(r"^\s*%%\w+")
+
 def _dir_pre(lang=None): return fr"\s*{langs[lang]}\s*\|"
-def _quarto_re(lang=None): return re.compile(_dir_pre(lang) + r'\s*[\w|-]+\s*:')
+
+class _DirParser:
+    "Precompiled regexes for finding and parsing the leading comment directives of `lang` cells"
+    def __init__(self, lang=None):
+        self.cmt = langs[lang]
+        self.pre = re.compile(_dir_pre(lang))
+        self.quarto = re.compile(_dir_pre(lang) + r'\s*[\w|-]+\s*:')
+
+    def first_code(self, lines):
+        "Index of the first line in `lines` which isn't blank, a directive, or a cell magic"
+        for i,o in enumerate(lines):
+            if o.strip() and not self.pre.match(o) and not _cell_mgc.match(o): return i
+
+    def partition(self, source):
+        "Split `source` into leading directive lines and code lines"
+        if not source: return [],[]
+        lines = source.splitlines(True)
+        i = self.first_code(lines)
+        return lines[:i],lines[i:]
+
+    def directive(self, s):
+        "Parse directive line `s` into the directive name and its arguments"
+        m = self.pre.match(s)
+        if m: s = f"{self.cmt}|" + s[m.end():]
+        if s.strip().endswith(':'): s = s.replace(':', '') # You can append colon at the end to be Quarto compliant.  Ex: #|hide:
+        if ':' in s: s = s.replace(':', ': ')
+        s = (s.strip()[2:]).strip().split()
+        if not s: return None
+        direc,*args = s
+        return direc,args
+
+    def norm_quarto(self, s):
+        "normalize quarto directives so they have a space after the colon"
+        m = self.quarto.match(s)
+        return m.group(0) + ' ' + self.quarto.sub('', s).lstrip() if m else s
+
+@functools.lru_cache(maxsize=None)
+def _dir_parser(lang=None): return _DirParser(lang)
+
+def _quarto_re(lang=None): return _dir_parser(lang).quarto
 
 # %% ../nbs/api/03_process.ipynb 11
-def _directive(s, lang='python'):
-    s = re.sub('^'+_dir_pre(lang), f"{langs[lang]}|", s)
-    if s.strip().endswith(':'): s = s.replace(':', '') # You can append colon at the end to be Quarto compliant.  Ex: #|hide:
-    if ':' in s: s = s.replace(':', ': ')
-    s = (s.strip()[2:]).strip().split()
-    if not s: return None
-    direc,*args = s
-    return direc,args
+def _directive(s, lang='python'): return _dir_parser(lang).directive(s)
 
 # %% ../nbs/api/03_process.ipynb 12
-def _norm_quarto(s, lang='python'):
-    "normalize quarto directives so they have a space after the colon"
-    m = _quarto_re(lang).match(s)
-    return m.group(0) + ' ' + _quarto_re(lang).sub('', s).lstrip() if m else s
+def _norm_quarto(s, lang='python'): return _dir_parser(lang).norm_quarto(s)
 
 # %% ../nbs/api/03_process.ipynb 14
-_cell_mgc = re.compile(r"^\s*%%\w+")
-
 def first_code_ln(code_list, re_pattern=None, lang='python'):
     "get first line number where code occurs, where `code_list` is a list of code"
-    if re_pattern is None: re_pattern = _dir_pre(lang)
+    if re_pattern is None: return _dir_parser(lang).first_code(code_list)
     return first(i for i,o in enumerate(code_list) if o.strip() != '' and not re.match(re_pattern, o) and not _cell_mgc.match(o))
 
 # %% ../nbs/api/03_process.ipynb 17
-def _partition_cell(cell, lang):
-    if not cell.source: return [],[]
-    lines = cell.source.splitlines(True)
-    first_code = first_code_ln(lines, lang=lang)
-    return lines[:first_code],lines[first_code:]
+def _partition_cell(cell, lang): return _dir_parser(lang).partition(cell.source)
 
 # %% ../nbs/api/03_process.ipynb 18
 def extract_directives(cell, remove=True, lang='python'):
     "Take leading comment directives from lines of code in `ss`, remove `#|`, and split"
-    dirs,code = _partition_cell(cell, lang)
+    p = _dir_parser(lang)
+    dirs,code = p.partition(cell.source)
     if not dirs: return {}
     if remove:
         # Leave Quarto directives and cell magic in place for later processing
-        cell['source'] = ''.join([_norm_quarto(o, lang) for o in dirs if _quarto_re(lang).match(o) or _cell_mgc.match(o)] + code)
-    return dict(L(_directive(s, lang) for s in dirs).filter())
+        cell['source'] = ''.join([p.norm_quarto(o) for o in dirs if p.quarto.match(o) or _cell_mgc.match(o)] + code)
+    return dict(d for d in map(p.directive, dirs) if d)
 
-# %% ../nbs/api/03_process.ipynb 21
+# %% ../nbs/api/03_process.ipynb 23
 def opt_set(var, newval):
     "newval if newval else var"
     return newval if newval else var
 
-# %% ../nbs/api/03_process.ipynb 22
+# %% ../nbs/api/03_process.ipynb 24
 def instantiate(x, **kwargs):
     "Instantiate `x` if it's a type"
     return x(**kwargs) if isinstance(x,type) else x
 
 def _mk_procs(procs, nb): return L(procs).map(instantiate, nb=nb)
 
-# %% ../nbs/api/03_process.ipynb 23
+# %% ../nbs/api/03_process.ipynb 25
 def _is_direc(f): return getattr(f, '__name__', '-')[-1]=='_'
 
-# %% ../nbs/api/03_process.ipynb 24
+# %% ../nbs/api/03_process.ipynb 26
+def _dir_methods(proc):
+    "Methods of `proc` named `_{directive}_`, keyed by directive"
+    nms = [o for o in dir(proc) if len(o)>2 and o[0]==o[-1]=='_' and o[1]!='_']
+    return {o[1:-1]:f for o,f in zip(nms, (getattr(proc, o, None) for o in nms)) if f}
+
+def _has_hooks(proc): return hasattr(proc,'begin') or hasattr(proc,'end')
+def _fusable(proc): return getattr(proc, 'fusable', False) and not _has_hooks(proc)
+def _per_cell(proc): return callable(proc) and not _is_direc(proc) and getattr(proc, '_visits_cells', True)
+
+# %% ../nbs/api/03_process.ipynb 27
 class NBProcessor:
     "Process cells and nbdev comments in a notebook"
-    def __init__(self, path=None, procs=None, nb=None, debug=False, rm_directives=True, process=False):
-        self.nb = read_nb(path) if nb is None else nb
+    def __init__(self, path=None, procs=None, nb=None, debug=False, rm_directives=True, process=False, fuse=False, lazy=False):
+        if nb is None: nb = read_nb_lazy(path) if lazy else read_nb(path)
+        self.nb = nb
         self.lang = nb_lang(self.nb)
         for cell in self.nb.cells: cell.directives_ = extract_directives(cell, remove=rm_directives, lang=self.lang)
         self.procs = _mk_procs(procs, nb=self.nb)
-        self.debug,self.rm_directives = debug,rm_directives
+        self.debug,self.rm_directives,self.fuse,self._dirty = debug,rm_directives,fuse,False
+        self._index()
         if process: self.process()
 
-    def _process_cell(self, proc, cell):
-        if not hasattr(cell,'source'): return
+    def _index(self):
+        "Positions of code cells for each directive, so directive processors only visit those cells"
+        self._dir_idx = defaultdict(list)
+        for i,cell in enumerate(self.nb.cells):
+            if cell.cell_type!='code': continue
+            for cmd in getattr(cell, 'directives_', None) or (): self._dir_idx[cmd].append(i)
+
+    def _compact(self):
+        "Remove cells deleted by processors, and renumber the rest"
+        self.nb.cells = [c for c in self.nb.cells if c and getattr(c,'source',None) is not None]
+        for i,cell in enumerate(self.nb.cells): cell.idx_ = i
+        self._index()
+        self._dirty = False
+
+    def _process_cell(self, proc, cell, nm, meths, visit):
+        if getattr(cell,'source',None) is None: return
         if cell.cell_type=='code' and cell.directives_:
             # Option 1: `proc` is directive name with `_` suffix
-            f = getattr(proc, '__name__', '-').rstrip('_')
-            if f in cell.directives_: self._process_comment(proc, cell, f)
+            if nm in cell.directives_: self._process_comment(proc, cell, nm)
             
             # Option 2: `proc` contains a method named `_{directive}_`
             for cmd in cell.directives_:
-                f = getattr(proc, f'_{cmd}_', None)
-                if f: self._process_comment(f, cell, cmd)
-        if callable(proc) and not _is_direc(proc): cell = opt_set(cell, proc(cell))
+                if cmd in meths: self._process_comment(meths[cmd], cell, cmd)
+        if visit: cell = opt_set(cell, proc(cell))
 
     def _process_comment(self, proc, cell, cmd):
         args = cell.directives_[cmd]
         if self.debug: print(cmd, args, proc)
         return proc(cell, *args)
         
-    def _proc(self, proc):
-        if hasattr(proc,'begin'): proc.begin()
-        for cell in self.nb.cells: self._process_cell(proc, cell)
-        if hasattr(proc,'end'): proc.end()
-        self.nb.cells = [c for c in self.nb.cells if c and getattr(c,'source',None) is not None]
-        for i,cell in enumerate(self.nb.cells): cell.idx_ = i
+    def _procs(self, procs, compact=True):
+        "Run `procs` together in a single traversal of the cells any of them need"
+        if any(map(_has_hooks, procs)) and self._dirty: self._compact()
+        begins = [p.begin for p in procs if hasattr(p,'begin')]
+        for f in begins: f()
+        if begins: self._index()
+        hs = [(p, getattr(p, '__name__', '-').rstrip('_'), _dir_methods(p), _per_cell(p)) for p in procs]
+        if any(h[3] for h in hs): cells = self.nb.cells
+        else:
+            dirs = {d for _,nm,meths,_ in hs for d in [nm,*meths] if d in self._dir_idx}
+            cells = [self.nb.cells[i] for i in sorted(set().union(*(self._dir_idx[d] for d in dirs)))]
+        for cell in cells:
+            for h in hs: self._process_cell(h[0], cell, *h[1:])
+        ends = [p.end for p in procs if hasattr(p,'end')]
+        for f in ends: f()
+        # `end` may add or move cells
+        if ends: self._index()
+        self._dirty = True
+        if compact: self._compact()
+
+    def _proc(self, proc, compact=True): self._procs([proc], compact=compact)
+
+    def _groups(self):
+        "Processors to run together: if `fuse`, runs of `fusable` processors, otherwise each on its own"
+        res = []
+        for p in self.procs:
+            if self.fuse and res and _fusable(p) and _fusable(res[-1][-1]): res[-1].append(p)
+            else: res.append([p])
+        return res
 
     def process(self):
         "Process all cells with all processors"
-        for proc in self.procs: self._proc(proc)
+        info = parse_cache_info()
+        for procs in self._groups(): self._procs(procs, compact=False)
+        self._compact()
+        # Hits and misses of `cell_ast` while processing this notebook, reported by `nbdev_proc_nbs`
+        self.nb.parse_cache_ = tuple(a-b for a,b in zip(parse_cache_info(), info))
+        if self.debug: print(parse_cache_info())
 
-# %% ../nbs/api/03_process.ipynb 34
+# %% ../nbs/api/03_process.ipynb 43
 class Processor:
     "Base class for processors"
     def __init__(self, nb): self.nb = nb
     def cell(self, cell): pass
     def __call__(self, cell): return self.cell(cell)
+    @property
+    def _visits_cells(self):
+        cls = type(self)
+        return cls.cell is not Processor.cell or cls.__call__ is not Processor.__call__
+
+# %% ../nbs/api/03_process.ipynb 49
+class NbBlob:
+    "A large output string, kept as the raw JSON bytes `buf[start:end]` (without quotes)"
+    def __init__(self, buf, start, end): self.buf,self.start,self.end = buf,start,end
+    def __len__(self): return self.end-self.start
+    def __repr__(self): return f'{type(self).__name__}({len(self)} bytes)'
+    def __str__(self): return json.loads(b'"'+self.buf[self.start:self.end]+b'"')
+    # `buf` is often an `mmap`, which can't be pickled, so copy out just our bytes
+    def __reduce__(self): return type(self), (self.buf[self.start:self.end], 0, len(self))
+
+    def rstrip(self):
+        "`NbBlob` without trailing newlines, as `str.rstrip` would give"
+        e = self.end
+        while e-2>=self.start and self.buf[e-2:e]==b'\\n': e -= 2
+        return NbBlob(self.buf, self.start, e)
+
+    def chunks(self, sz=2**20):
+        "The raw JSON text, in pieces of at most `sz` characters"
+        for i in range(self.start, self.end, sz): yield self.buf[i:min(i+sz, self.end)].decode('ascii')
+
+# %% ../nbs/api/03_process.ipynb 50
+class NbLazy:
+    "A JSON value kept as the raw bytes `buf[start:end]`, and only parsed when it's used"
+    def __init__(self, buf, start, end): self.buf,self.start,self.end = buf,start,end
+    def __repr__(self): return f"{type(self).__name__}({self.end-self.start} bytes)"
+    def __reduce__(self):
+        # `buf` is often an `mmap`, which can't be pickled; the value is used instead if it's been parsed, as it may have changed
+        if 'value' in self.__dict__: return _dict2obj, (self.value,)
+        return type(self), (self.buf[self.start:self.end], 0, self.end-self.start)
+
+    @property
+    def value(self):
+        "The parsed value, which is what gets written back out"
+        if 'value' not in self.__dict__: self.__dict__['value'] = _dict2obj(json.loads(self.buf[self.start:self.end]))
+        return self.__dict__['value']
+
+    def __getattr__(self, k):
+        if k.startswith('__'): raise AttributeError(k)
+        return getattr(self.value, k)
+    def __len__(self): return len(self.value)
+    def __iter__(self): return iter(self.value)
+    def __bool__(self): return bool(self.value)
+    def __eq__(self, o): return self.value==(o.value if isinstance(o, NbLazy) else o)
+    def __getitem__(self, i): return self.value[i]
+    def __setitem__(self, i, v): self.value[i] = v
+    def __delitem__(self, i): del(self.value[i])
+
+# %% ../nbs/api/03_process.ipynb 51
+_re_blob_key = re.compile(rb'"image/(?!svg)[^"\\]*":\s*"')
+_re_lazy_key = re.compile(rb'"(?:image/(?!svg)[^"\\]*":\s*"|(?:outputs|attachments)":\s*[\[{])')
+_re_b64 = re.compile(rb'[A-Za-z0-9+/=\\n]*')
+_re_bad_esc = re.compile(rb'\\(?!n)')
+_re_blob_ref = re.compile(r'"\\u0000nbdev-blob-(\d+)"')
+_re_json_tok = re.compile(rb'[\[\]{}"]')
+
+def _str_end(buf, pos):
+    "End of the JSON string whose contents start at `buf[pos]`"
+    while True:
+        e = buf.find(b'"', pos)
+        if e<0: raise ValueError('Unterminated JSON string')
+        # The quote is escaped if it follows an odd number of backslashes
+        i = e
+        while buf[i-1:i]==b'\\': i -= 1
+        if (e-i)%2==0: return e+1
+        pos = e+1
+
+def _json_end(buf, pos):
+    "End of the JSON array or object which starts at `buf[pos]`"
+    depth = 0
+    while True:
+        m = _re_json_tok.search(buf, pos)
+        if m is None: raise ValueError('Unterminated JSON array or object')
+        c,pos = buf[m.start():m.end()],m.end()
+        if c==b'"': pos = _str_end(buf, pos)
+        else:
+            depth += 1 if c in b'[{' else -1
+            if not depth: return pos
+
+def _loads_nb(buf, min_blob=2**16, lazy=False):
+    "Parse notebook JSON `buf`, leaving large base64 images as `NbBlob`s, and if `lazy` outputs and attachments as `NbLazy`s"
+    parts,objs,pos = [],[],0
+    key_re = _re_lazy_key if lazy else _re_blob_key
+    m = key_re.search(buf)
+    while m:
+        s = e = m.end()
+        if buf[s-1:s]==b'"':
+            e = buf.find(b'"', s)
+            # Only plain base64, which `json.dumps` would write back out byte for byte
+            if e-s<min_blob or not _re_b64.fullmatch(buf, s, e) or _re_bad_esc.search(buf, s, e): o = None
+            else: o,ref = NbBlob(buf, s, e),b'\\u0000nbdev-blob-%d'
+        else:
+            s -= 1
+            e = _json_end(buf, s)
+            o,ref = NbLazy(buf, s, e),b'"\\u0000nbdev-blob-%d"'
+        if o is not None:
+            parts += [buf[pos:s], ref % len(objs)]
+            objs.append(o)
+            pos = e
+        m = key_re.search(buf, e)
+    parts.append(buf[pos:])
+    def _hook(d):
+        for k,v in d.items():
+            if isinstance(v,str) and v.startswith('\x00nbdev-blob-'): d[k] = objs[int(v[12:])]
+        return d
+    return json.loads(b''.join(parts), object_hook=_hook if objs else None)
+
+# %% ../nbs/api/03_process.ipynb 52
+def _read_buf(f):
+    "Raw bytes of path or stream `f`, memory mapped if possible"
+    if not isinstance(f, (str,Path)): return f.buffer.read() if hasattr(f, 'buffer') else f.read().encode('utf-8')
+    with open(f, 'rb') as fh:
+        # Windows can't replace a file which is mapped, so we can't write it back in place
+        if sys.platform=='win32' or not os.fstat(fh.fileno()).st_size: return fh.read()
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+def read_nb_stream(f, # Notebook path or stream to read from
+                   min_blob:int=2**16, # Size in bytes of the smallest image output kept as an `NbBlob`
+                   lazy:bool=False): # Leave outputs and attachments unparsed until they're used?
+    "Notebook `dict` read from `f`, with large image outputs left as `NbBlob`s"
+    return _loads_nb(_read_buf(f), min_blob, lazy=lazy)
+
+def read_nb_lazy(path):
+    "Like `read_nb`, but outputs and attachments are only parsed when they're used"
+    res = dict2nb(read_nb_stream(path, lazy=True))
+    res['path_'] = str(path)
+    return res
+
+# %% ../nbs/api/03_process.ipynb 53
+def _nb_chunks(nb):
+    "Pieces of the text `nb2str(nb)` would give, reading `NbBlob`s straight from their source"
+    blobs = []
+    def _ref(o):
+        if isinstance(o, NbLazy): return o.value
+        if not isinstance(o, NbBlob): raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+        blobs.append(o)
+        return f'\x00nbdev-blob-{len(blobs)-1}'
+    if isinstance(nb, (AttrDict,list)): nb = nb2dict(nb)
+    txt = json.dumps(nb, sort_keys=True, indent=1, ensure_ascii=False, default=_ref) + "\n"
+    if not blobs:
+        yield txt
+        return
+    pos = 0
+    for m in _re_blob_ref.finditer(txt):
+        yield txt[pos:m.start()+1]
+        yield from blobs[int(m.group(1))].chunks()
+        pos = m.end()-1
+    yield txt[pos:]
+
+def write_nb_stream(nb, # Notebook to write, which may contain `NbBlob`s
+                    f): # Notebook path or text stream to write to
+    "Write `nb` to `f` as `write_nb` would, without building its text in memory"
+    if not isinstance(f, (str,Path)):
+        for o in _nb_chunks(nb): f.write(o)
+        return
+    path = Path(f).resolve()
+    tmp = path.with_name(f'.{path.name}.tmp')
+    try:
+        with open(tmp, 'w', encoding='utf-8') as fo:
+            for o in _nb_chunks(nb): fo.write(o)
+        # Like `write_nb`, leave the file alone if it hasn't changed
+        if path.exists():
+            if filecmp.cmp(tmp, path, shallow=False): return
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists(): tmp.unlink()
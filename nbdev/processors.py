@@ -11,17 +11,20 @@ import importlib
 
 from .config import *
 from .imports import *
+from .maker import cell_ast
 from .process import *
 from .showdoc import *
 from .doclinks import *
+from .doclinks import _lib_deps
 from .frontmatter import *
 from .frontmatter import _fm2dict
 
 from execnb.nbio import *
-from execnb.shell import *
+from execnb.nbio import _dict2obj
 from fastcore.imports import *
 from fastcore.xtras import *
-import sys,yaml
+import sys,hashlib,json
+from . import __version__
 
 # %% ../nbs/api/10_processors.ipynb 7
 _langs = 'bash|html|javascript|js|latex|markdown|perl|ruby|sh|svg'
@@ -45,7 +48,7 @@ class insert_warning(Processor):
 # %% ../nbs/api/10_processors.ipynb 13
 _def_types = (ast.FunctionDef,ast.AsyncFunctionDef,ast.ClassDef)
 def _def_names(cell, shown):
-    cellp = cell.parsed_()
+    cellp = cell_ast(cell)
     return [showdoc_nm(o) for o in concat(cellp)
             if isinstance(o,_def_types) and o.name not in shown and o.name[0]!='_'] if cellp else []
 
@@ -71,7 +74,7 @@ class add_show_docs(Processor):
     def begin(self):
         nb = self.nb
         exports = L(cell for cell in nb.cells if _want_doc(cell))
-        trees = L(nb.cells).map(NbCell.parsed_).concat()
+        trees = L(nb.cells).map(cell_ast).concat()
         shown_docs = {_get_nm(t) for t in _show_docs(trees)}
         for cell in reversed(exports):
             if cell_lang(cell) != 'python':  raise ValueError(f"{cell.metadata.language} can't export:\n{cell.source}")
@@ -175,7 +178,7 @@ def _ast_contains(trees, types):
 def _do_eval(cell):
     if cell_lang(cell) != 'python': return
     if not cell.source or 'nbdev_export'+'()' in cell.source: return
-    trees = cell.parsed_()
+    trees = cell_ast(cell)
     if cell.cell_type != 'code' or not trees: return
     if cell.directives_.get('eval:', [''])[0].lower() == 'false': return
 
@@ -188,21 +191,67 @@ def _do_eval(cell):
     if _show_docs(trees): return True
 
 # %% ../nbs/api/10_processors.ipynb 40
+_shell = None
+
+def _warm_shell():
+    "A `CaptureShell` shared by all notebooks processed in this process, given fresh namespaces each time"
+    from execnb.shell import CaptureShell
+    from IPython.core.interactiveshell import InteractiveShell
+    global _shell
+    if _shell is None:
+        for o in get_config().get('exec_preload', '').split(): importlib.import_module(o)
+        _shell = CaptureShell()
+    else:
+        _shell.init_create_namespaces()
+        _shell.init_user_ns()
+        _shell.count,_shell.exc,_shell.result = 1,None,None
+        InteractiveShell._instance = _shell
+    _shell.run_cell('from nbdev.showdoc import show_doc')
+    return _shell
+
+_widget_mime = 'application/vnd.jupyter.widget-view+json'
+
+# Settings read by `show_doc` and `_warm_shell`, or used in the doc and source links `show_doc` renders.
+# Keep in sync with them, since changing other settings (such as `version`) doesn't invalidate cached outputs
+_showdoc_cfg_keys = 'renderer exec_preload lib_name lib_path nbs_path user branch git_url doc_host doc_baseurl strip_libs'.split()
+
+def _showdoc_key(cells):
+    "Hash of the sources of `cells`, the library modules they import, the settings used by `show_doc`, and the nbdev version"
+    cfg = get_config()
+    h = hashlib.sha1(repr((__version__, [c.source for c in cells], [str(cfg.get(k, '')) for k in _showdoc_cfg_keys])).encode())
+    for f in _lib_deps(L(cells).map(cell_ast).concat(), cfg.lib_path): h.update(f.read_bytes())
+    return h.hexdigest()
+
 class exec_show_docs(Processor):
     "Execute cells needed for `show_docs` output, including exported cells and imports"
     def begin(self):
-        if nb_lang(self.nb) != 'python': return
-        self.k = CaptureShell()
-        self.k.run_cell('from nbdev.showdoc import show_doc')
+        self.fn,self.res = None,[]
+        fm = getattr(self.nb, 'frontmatter_', {})
+        if nb_lang(self.nb)!='python' or not getattr(self.nb, 'has_docs_', None) or str2bool(fm.get('skip_showdoc', False)): return
+        cells = [c for c in self.nb.cells if _do_eval(c)]
+        self.ids = {id(c) for c in cells}
+        # `exec_doc` cells are run for every build, so their notebooks aren't cached
+        path = getattr(self.nb, 'path_', None)
+        if path and not any('exec_doc' in c.directives_ for c in cells):
+            # One entry per notebook, overwritten when its key changes
+            self.fn = cache_path('showdoc', hashlib.sha1(str(Path(path).resolve()).encode()).hexdigest()+'.json')
+            self.key = _showdoc_key(cells)
+        try: cached = json.loads(self.fn.read_text()) if self.fn else {}
+        except (OSError,ValueError): cached = {}
+        hit = bool(self.fn) and cached.get('key')==self.key
+        self.nb.showdoc_cache_ = (hit, len(cells))
+        if not hit: self.k = _warm_shell()
+        else:
+            for c,o in zip(cells, cached['outputs']):
+                if o: c.outputs,c['execution_count'] = _dict2obj(o['outputs']),o['execution_count']
 
     def __call__(self, cell):
-        if not self.nb.has_docs_ or not hasattr(self, 'k'): return
-        fm = getattr(self.nb, 'frontmatter_', {})
-        if str2bool(fm.get('skip_showdoc', False)): return
-        if _do_eval(cell): self.k.cell(cell)
-        title = fm.get('title', '')
+        if not hasattr(self, 'k') or id(cell) not in self.ids: return
+        self.k.cell(cell)
+        title = getattr(self.nb, 'frontmatter_', {}).get('title', '')
         if self.k.exc: 
             raise Exception(f"Error{' in notebook: '+title if title else ''} in cell {cell.idx_} :\n{cell.source}") from self.k.exc[1]
+        self.res.append(dict(outputs=[*self.k.out], execution_count=cell.get('execution_count')) if self.k.out else None)
 
     def end(self):
         try: from ipywidgets import Widget
@@ -213,16 +262,24 @@ class exec_show_docs(Processor):
             new = Widget.get_manager_state(drop_defaults=True)
             widgets = {**old, **new, 'state': {**old.get('state', {}), **new['state']}}
             self.nb.metadata['widgets'] = {mimetype: widgets}
+        if hasattr(self, 'k') and self.fn and not any(_widget_mime in o.get('data', {}) for r in self.res if r for o in r['outputs']):
+            self.fn.parent.mkdir(exist_ok=True)
+            self.fn.write_text(json.dumps(dict(key=self.key, nb=str(self.nb.path_), outputs=self.res)))
 
-# %% ../nbs/api/10_processors.ipynb 42
+# %% ../nbs/api/10_processors.ipynb 47
 def _import_obj(s):
     mod_nm, obj_nm = s.split(':')
     mod = importlib.import_module(mod_nm)
     return getattr(mod, obj_nm)
 
-# %% ../nbs/api/10_processors.ipynb 43
+# %% ../nbs/api/10_processors.ipynb 48
+# Built-in processors which only look at the cell they're given, and so can be fused
+for o in (strip_ansi, hide_line, filter_stream_, rm_header_dash, clean_show_doc, rm_export, clean_magics, hide_, add_links,
+          strip_hidden_metadata): o.fusable = True
+
 class FilterDefaults:
     "Override `FilterDefaults` to change which notebook processors are used"
+    fuse = True
     def xtra_procs(self):
         imps = get_config().get('procs', '').split()
         return [_import_obj(o) for o in imps]
@@ -238,6 +295,6 @@ class FilterDefaults:
     
     def nb_proc(self, nb):
         "Get an `NBProcessor` with these processors"
-        return NBProcessor(nb=nb, procs=self.procs())
+        return NBProcessor(nb=nb, procs=self.procs(), fuse=self.fuse)
     
     def __call__(self, nb): return self.nb_proc(nb).process()
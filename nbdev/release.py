@@ -7,7 +7,6 @@ __all__ = ['GH_HOST', 'Release', 'changelog', 'release_git', 'release_gh', 'pypi
 
 # %% ../nbs/api/18_release.ipynb 14
 from fastcore.all import *
-from ghapi.core import *
 
 from datetime import datetime
 import shutil,subprocess
@@ -55,6 +54,7 @@ class Release:
         if not token and Path('token').exists(): token = Path('token').read_text().strip()
         token = ifnone(token, os.getenv('GITHUB_TOKEN',None))
         if not token: raise Exception('Failed to find token')
+        from ghapi.core import GhApi
         self.gh = GhApi(owner, repo, token)
         self.groups = groups
 
@@ -137,7 +137,7 @@ from fastcore.all import *
 from .config import *
 from .cli import *
 
-import yaml,subprocess,glob,platform
+import subprocess,glob,platform
 from os import system
 try: from packaging.version import parse
 except ImportError: from pip._vendor.packaging.version import parse
@@ -187,6 +187,7 @@ def _write_yaml(path, name, d1, d2):
     path = Path(path)
     p = path/name
     p.mkdir(exist_ok=True, parents=True)
+    import yaml
     yaml.SafeDumper.ignore_aliases = lambda *args : True
     with (p/'meta.yaml').open('w', encoding="utf-8") as f:
         yaml.safe_dump(d1, f)
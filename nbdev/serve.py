@@ -4,7 +4,7 @@
 __all__ = ['proc_nbs']
 
 # %% ../nbs/api/17_serve.ipynb 2
-import ast,subprocess,threading,sys
+import ast,subprocess,threading,sys,hashlib,json
 from shutil import rmtree,copy2
 
 from fastcore.utils import *
@@ -12,12 +12,15 @@ from fastcore.parallel import parallel
 from fastcore.script import call_parse
 from fastcore.meta import delegates
 
-from .config import get_config
-from .doclinks import nbglob_cli,nbglob
+from .config import get_config,cache_path
+from .maker import cell_ast
+from .doclinks import nbglob_cli,nbglob,_hash_file,_lib_deps
 from .processors import FilterDefaults
 import nbdev.serve_drv
 
-# %% ../nbs/api/17_serve.ipynb 4
+from execnb.nbio import read_nb,NbCell
+
+# %% ../nbs/api/17_serve.ipynb 5
 def _is_qpy(path:Path):
     "Is `path` a py script starting with frontmatter?"
     path = Path(path)
@@ -32,16 +35,72 @@ def _is_qpy(path:Path):
         vl = v.splitlines()
         if vl[0]=='---' and vl[-1]=='---': return '\n'.join(vl[1:-1])
 
-# %% ../nbs/api/17_serve.ipynb 5
-def _proc_file(s, cache, path, mtime=None):
+# %% ../nbs/api/17_serve.ipynb 6
+_proc_mods = 'process processors frontmatter showdoc serve_drv'.split()
+
+def _procs_version():
+    "Hash of the nbdev version and the modules used to process files"
+    h = hashlib.sha1(nbdev.__version__.encode())
+    for o in _proc_mods: h.update((Path(nbdev.__file__).parent/f'{o}.py').read_bytes())
+    return h.hexdigest()
+
+def _cfg_version(cfg):
+    "Hash of all settings in `cfg`, since processors (including custom ones and `exporter`) can read any of them"
+    return hashlib.sha1(json.dumps(sorted(cfg.d.items())).encode()).hexdigest()
+
+# %% ../nbs/api/17_serve.ipynb 7
+class _ProcDeps:
+    "Dependencies of each file processed into the `_proc` cache: its contents, settings, library modules, and processors"
+    def __init__(self, path, force=False):
+        self.path,self.cfg,self.fn,self.dirty,self.hashes = Path(path),get_config(),cache_path('proc.json'),[],{}
+        self.d = {} if force or not self.fn.exists() else json.loads(self.fn.read_text())
+        self.procs,self.cfg_hash = _procs_version(),_cfg_version(self.cfg)
+
+    def _hash(self, fn):
+        if fn not in self.hashes: self.hashes[fn] = _hash_file(self.cfg.config_path/fn)
+        return self.hashes[fn]
+    def _fp(self, s, old=None):
+        st = s.stat()
+        if old and old['fp'][:2]==[st.st_mtime_ns,st.st_size]: return old['fp']
+        return [st.st_mtime_ns, st.st_size, _hash_file(s)]
+
+    def deps(self, s):
+        "Settings, library files, and processor version affecting the output of `s`"
+        if s.suffix=='.ipynb': trees,cfg,xtra = L(read_nb(s).cells).map(cell_ast).concat(),self.cfg_hash,['_modidx.py']
+        elif _is_qpy(s) is not None: trees,cfg,xtra = ast.parse(s.read_text()).body,None,[]
+        else: return dict(cfg=None, libs={}, procs=None)
+        libs = _lib_deps(trees, self.cfg.lib_path) + [self.cfg.lib_path/o for o in xtra]
+        libs = [str(o.resolve().relative_to(self.cfg.config_path.resolve())) for o in libs if o.exists()]
+        return dict(cfg=cfg, libs={o:self._hash(o) for o in libs}, procs=self.procs)
+
+    def fresh(self, s, d):
+        "Is `d`, the processed output of `s`, up to date? If not, `s` is recorded for `save`"
+        old = self.d.get(str(s.relative_to(self.path)))
+        if not (d.exists() and old): return self.dirty.append(s)
+        fp = self._fp(s, old)
+        res = fp[2]==old['fp'][2] and old['cfg'] in (None, self.cfg_hash) and old['procs'] in (None, self.procs) \
+            and all(self._hash(o)==h for o,h in old['libs'].items())
+        if res: old['fp'] = fp
+        else: self.dirty.append(s)
+        return res
+
+    def save(self):
+        "Record the current dependencies of all files processed since the last save"
+        for s in self.dirty:
+            k = str(s.relative_to(self.path))
+            self.d[k] = dict(fp=self._fp(s, self.d.get(k)), **self.deps(s))
+        self.fn.write_text(json.dumps(self.d))
+        self.dirty = []
+
+# %% ../nbs/api/17_serve.ipynb 8
+def _proc_file(s, cache, path, deps=None):
     skips = ('_proc', '_docs', '_site')
     if not s.is_file() or any(o[0]=='.' or o in skips for o in s.parts): return
     d = cache/s.relative_to(path)
     if s.suffix=='.py': d = d.with_suffix('')
-    if d.exists():
-        dtime = d.stat().st_mtime
-        if mtime: dtime = max(dtime, mtime)
-        if s.stat().st_mtime<=dtime: return
+    if deps is not None:
+        if deps.fresh(s, d): return
+    elif d.exists() and s.stat().st_mtime<=d.stat().st_mtime: return
 
     d.parent.mkdir(parents=True, exist_ok=True)
     if s.suffix=='.ipynb': return s,d,FilterDefaults
@@ -49,7 +108,17 @@ def _proc_file(s, cache, path, mtime=None):
     if md is not None: return s,d,md.strip()
     else: copy2(s,d)
 
-# %% ../nbs/api/17_serve.ipynb 7
+# %% ../nbs/api/17_serve.ipynb 12
+def _report_caches(res):
+    "Print how many notebooks and cells had `show_doc` outputs filled from the cache, and how many cell ASTs were reused"
+    res = L(res).filter()
+    sd = res.itemgot(0).filter()
+    if sd:
+        hits = sd.filter(itemgetter(0))
+        print(f"show_doc cache: {len(hits)}/{len(sd)} notebooks, {sum(hits.itemgot(1))}/{sum(sd.itemgot(1))} cells reused")
+    pc = res.itemgot(1).filter()
+    if pc: print(f"AST cache: {sum(pc.itemgot(0))}/{sum(pc.itemgot(0))+sum(pc.itemgot(1))} cell parses reused")
+
 @delegates(nbglob_cli)
 def proc_nbs(
     path:str='', # Path to notebooks
@@ -66,14 +135,11 @@ def proc_nbs(
     if (path/'_quarto.yml').exists(): files.append(path/'_quarto.yml')
     if (path/'_extensions').exists(): files.extend(nbglob(path/'_extensions', func=Path, file_glob='', file_re='', skip_file_re='^[.]'))
 
-    # If settings.ini or filter script newer than cache folder modified, delete cache
-    chk_mtime = max(cfg.config_file.stat().st_mtime, Path(__file__).stat().st_mtime)
-    cache.mkdir(parents=True, exist_ok=True)
-    cache_mtime = cache.stat().st_mtime
-    if force or (cache.exists and cache_mtime<chk_mtime): rmtree(cache)
-
-    files = files.map(_proc_file, mtime=cache_mtime, cache=cache, path=path).filter()
+    if force and cache.exists(): rmtree(cache)
+    deps = _ProcDeps(path, force=force)
+    files = files.map(_proc_file, deps=deps, cache=cache, path=path).filter()
     kw = {} if IN_NOTEBOOK else {'method':'spawn'}
-    parallel(nbdev.serve_drv.main, files, n_workers=n_workers, pause=0.01, **kw)
-    if cache.exists(): cache.touch()
+    res = parallel(nbdev.serve_drv.main, files, n_workers=n_workers, pause=0.01, **kw)
+    deps.save()
+    _report_caches(res)
     return cache
@@ -15,12 +15,15 @@ def exec_nb(src, dst, cb):
     nb = read_nb(src)
     cb()(nb)
     write_nb(nb, dst)
+    return getattr(nb, 'showdoc_cache_', None),getattr(nb, 'parse_cache_', None)
 
 def main(o):
     src,dst,x = o
     os.environ["IN_TEST"] = "1"
-    if src.suffix=='.ipynb': exec_nb(src, dst, x)
+    res = None
+    if src.suffix=='.ipynb': res = exec_nb(src, dst, x)
     elif src.suffix=='.py': exec_scr(src, dst, x)
     else: raise Exception(src)
     del os.environ["IN_TEST"]
+    return res
 
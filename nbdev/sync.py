@@ -45,14 +45,15 @@ def _to_absolute(code, py_path, lib_dir):
 # %% ../nbs/api/06_sync.ipynb 11
 def _update_nb(nb_path, cells, lib_dir):
     "Update notebook `nb_path` with contents from `cells`"
-    nbp = NBProcessor(nb_path, ExportModuleProc(), rm_directives=False)
+    nbp = NBProcessor(nb_path, ExportModuleProc(), rm_directives=False, lazy=True)
     nbp.process()
     for cell in cells:
         assert cell.nb_path == nb_path
         nbcell = nbp.nb.cells[cell.idx]
         dirs,_ = _partition_cell(nbcell, 'python')
         nbcell.source = ''.join(dirs) + _to_absolute(cell.code, cell.py_path, lib_dir)
-    write_nb(nbp.nb, nb_path)
+    # Writes unparsed outputs back out, and replaces the file rather than overwriting it while it may be memory mapped
+    write_nb_stream(nbp.nb, nb_path)
 
 # %% ../nbs/api/06_sync.ipynb 12
 def _update_mod(py_path, lib_dir):
@@ -60,7 +61,7 @@ def _update_mod(py_path, lib_dir):
     py_cells = L(_iter_py_cells(py_path)).filter(lambda o: o.nb != 'auto')
     for nb_path,cells in groupby(py_cells, 'nb_path').items(): _update_nb(nb_path, cells, lib_dir)
 
-# %% ../nbs/api/06_sync.ipynb 14
+# %% ../nbs/api/06_sync.ipynb 15
 @call_parse
 def nbdev_update(fname:str=None): # A Python file name to update
     "Propagate change in modules matching `fname` to notebooks that created them"
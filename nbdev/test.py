@@ -1,32 +1,50 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/api/12_test.ipynb.
 
 # %% auto 0
-__all__ = ['test_nb', 'nbdev_test']
+__all__ = ['test_nb', 'nbdev_test', 'nbdev_test_report', 'nbdev_test_worker']
 
 # %% ../nbs/api/12_test.ipynb 2
-import time,os,sys,traceback,contextlib, inspect
+import time,os,sys,traceback,contextlib, inspect,hashlib,json,shutil,socket,importlib,concurrent.futures,signal,threading
+from statistics import median
+from collections import Counter
+from multiprocessing import get_context, get_all_start_methods, active_children
 from fastcore.basics import *
 from fastcore.imports import *
 from fastcore.foundation import *
 from fastcore.parallel import *
 from fastcore.script import *
 from fastcore.meta import delegates
+from fastcore.xtras import run
 
 from .config import *
 from .doclinks import *
-from .process import NBProcessor, nb_lang
+from .doclinks import _lib_deps,_lib_file,_iter_py_cells
+from .maker import cell_ast
+from .process import NBProcessor, nb_lang, read_nb_lazy
 from .frontmatter import FrontmatterProc
 
 from execnb.nbio import *
-from execnb.shell import *
 
-# %% ../nbs/api/12_test.ipynb 3
+# %% ../nbs/api/12_test.ipynb 4
+def _segments(nb):
+    "Segment of each cell in `nb`: 0 before the first `checkpoint` directive, then counting up from 1 at each one"
+    n,res = 0,[]
+    for cell in nb.cells:
+        if 'checkpoint' in (getattr(cell, 'directives_', None) or {}): n += 1
+        res.append(n)
+    return res
+
+# %% ../nbs/api/12_test.ipynb 5
 def test_nb(fn,  # file name of notebook to test
             skip_flags=None,  # list of flags marking cells to skip
             force_flags=None,  # list of flags marking cells to always run
             do_print=False,  # print completion?
             showerr=True,  # print errors to stderr?
-            basepath=None):  # path to add to sys.path
+            basepath=None,  # path to add to sys.path
+            segment=None,  # only run cells before the first `checkpoint` and in this segment
+            cell_times=None,  # dict in which to store the time each cell took, keyed on cell index
+            on_cell=None,  # function called with each cell before it's run
+            failure=None):  # dict in which to store the index and traceback of the cell that failed
     "Execute tests in notebook in `fn` except those with `skip_flags`"
     if basepath: sys.path.insert(0, str(basepath))
     if not IN_NOTEBOOK: os.environ["IN_TEST"] = '1'
@@ -34,28 +52,42 @@ def test_nb(fn,  # file name of notebook to test
     nb = NBProcessor(fn, procs=FrontmatterProc, process=True).nb
     fm = getattr(nb, 'frontmatter_', {})
     if str2bool(fm.get('skip_exec', False)) or nb_lang(nb) != 'python': return True, 0
+    segs = _segments(nb)
 
     def _no_eval(cell):
         if cell.cell_type != 'code': return True
         if 'nbdev_export'+'(' in cell.source: return True
         direc = getattr(cell, 'directives_', {}) or {}
         if direc.get('eval:', [''])[0].lower() == 'false': return True
+        if segment is not None and segs[cell.idx_] not in (0, segment): return True
         return flags & direc.keys()
+
+    cell_start = 0
+    def _pre(cell):
+        nonlocal cell_start
+        cell_start = time.time()
+        if on_cell: on_cell(cell)
+        return _no_eval(cell)
+    def _post(cell):
+        if cell_times is not None: cell_times[cell.idx_] = time.time()-cell_start
     
     start = time.time()
+    from execnb.shell import CaptureShell
     k = CaptureShell(fn)
     if do_print: print(f'Starting {fn}')
     try:
         with working_directory(fn.parent):
-            k.run_all(nb, exc_stop=True, preproc=_no_eval)
+            k.run_all(nb, exc_stop=True, preproc=_pre, postproc=_post)
             res = True
     except: 
-        if showerr: sys.stderr.write(k.prettytb(fname=fn)+'\n')
+        tb = k.prettytb(fname=fn)
+        if showerr: sys.stderr.write(tb+'\n')
+        if failure is not None: failure.update(cell=k._cell_idx-1 if k._cell_idx else -1, traceback=tb)
         res=False
     if do_print: print(f'- Completed {fn}')
     return res,time.time()-start
 
-# %% ../nbs/api/12_test.ipynb 8
+# %% ../nbs/api/12_test.ipynb 14
 def _keep_file(p:Path, # filename for which to check for `indicator_fname`
                ignore_fname:str # filename that will result in siblings being ignored
                 ) -> bool:
@@ -63,7 +95,205 @@ def _keep_file(p:Path, # filename for which to check for `indicator_fname`
     if p.exists(): return not bool(p.parent.ls().attrgot('name').filter(lambda x: x == ignore_fname))
     else: True
 
-# %% ../nbs/api/12_test.ipynb 10
+# %% ../nbs/api/12_test.ipynb 15
+@functools.lru_cache(None)
+def _file_digest(f, mtime):
+    "SHA1 digest of file `f`, read once for each modification time"
+    return hashlib.sha1(Path(f).read_bytes()).digest()
+
+def _test_key(fn, flags):
+    "Hash of notebook `fn`, the `flags` of cells it skips, and the library modules it imports"
+    h = hashlib.sha1(Path(fn).read_bytes())
+    h.update(repr(sorted(flags)).encode())
+    for f in _lib_deps(L(read_nb_lazy(fn).cells).map(cell_ast).concat()): h.update(_file_digest(f, os.stat(f).st_mtime_ns))
+    return h.hexdigest()
+
+def _read_test_cache():
+    fn = cache_path('test.json')
+    return json.loads(fn.read_text()) if fn.exists() else {}
+
+def _write_test_cache(cache, files, keys, results):
+    "Add the notebooks in `files` that passed to `cache`, replacing their old entries"
+    names = {str(f) for f in files}
+    cache = {k:v for k,v in cache.items() if v['nb'] not in names or k in keys}
+    for f,k,(passed,t) in zip(files, keys, results):
+        if passed: cache[k] = dict(nb=str(f), time=t)
+    cache_path('test.json').write_text(json.dumps(cache))
+
+def _hist_times(cache):
+    "Time each notebook in the test `cache` took when it last passed"
+    return {v['nb']:v['time'] for v in cache.values()}
+
+def _test_segments(fn):
+    "Segments to test `fn` in (see `test_nb`), or `[None]` if it has no checkpoints"
+    n = max(_segments(NBProcessor(fn).nb), default=0)
+    return list(range(1, n+1)) if n else [None]
+
+def _test_unit(o, cell_timeout=0, nb_timeout=0, max_rss=0, isolate=False, **kwargs):
+    fn,segment = o
+    if isolate or cell_timeout or nb_timeout or max_rss:
+        return _test_nb_limited(fn, cell_timeout, nb_timeout, max_rss, segment=segment, **kwargs)
+    cell_times,failure = {},{}
+    return (*test_nb(fn, segment=segment, cell_times=cell_times, failure=failure, **kwargs), cell_times, failure or None)
+
+def _merge(rs):
+    "Combine results `(passed, time, cell_times, failure)` of units of work on the same file"
+    return (all(o[0] for o in rs), sum(o[1] for o in rs), merge(*[o[2] for o in rs]), first(o[3] for o in rs if o[3]))
+
+def _on_term(*args):
+    "Kill any notebook being tested in a child of this process, then exit"
+    for p in active_children(): p.kill()
+    os._exit(1)
+
+def _init_worker(pids=None):
+    "Kill tests if terminated, and record the pid of this worker in the `pids` queue"
+    signal.signal(signal.SIGTERM, _on_term)
+    if pids is not None: pids.put(os.getpid())
+
+def _run_units(units, n_workers=0, pause=0, method=None, **kwargs):
+    "Call `_test_unit` on each of `units` in `n_workers` processes, yielding `(index, result)` as each finishes"
+    if not parallelable('n_workers', n_workers, _test_unit): n_workers = 0
+    if not n_workers:
+        for i,o in enumerate(units): yield i,_test_unit(o, **kwargs)
+        return
+    ctx = get_context(method)
+    pids = ctx.SimpleQueue()
+    with concurrent.futures.ProcessPoolExecutor(n_workers, mp_context=ctx, initializer=_init_worker, initargs=(pids,)) as ex:
+        futs = {}
+        for i,o in enumerate(units):
+            futs[ex.submit(_test_unit, o, **kwargs)] = i
+            if i<n_workers: time.sleep(pause)
+        try:
+            for f in concurrent.futures.as_completed(futs): yield futs[f],f.result()
+        except GeneratorExit:
+            # Stopped early, so drop the units not started yet, and stop those running. Once one worker is gone the pool
+            # is broken, so the executor stops any which started after their pids were read
+            for f in futs: f.cancel()
+            while not pids.empty():
+                try: os.kill(pids.get(), signal.SIGTERM)
+                except ProcessLookupError: pass
+            raise
+
+def _collect(units, it, out=None, max_failures=0):
+    "Results for each file of the `units` results yielded by `it`, passing each to `out` as soon as all its units are done"
+    unit_res,groups,failed = {},groupby(range(len(units)), lambda i:units[i][0]),set()
+    left = {f:len(idxs) for f,idxs in groups.items()}
+    def _res(f): return _merge([unit_res[j] for j in groups[f] if j in unit_res])
+    for i,r in it:
+        unit_res[i] = r
+        f = units[i][0]
+        left[f] -= 1
+        if not r[0]: failed.add(f)
+        if out and not left[f]: out.add(f, *_res(f))
+        if max_failures and len(failed)>=max_failures:
+            it.close()
+            if out:
+                for f in failed:
+                    if left[f]: out.add(f, *_res(f))
+            break
+    return {f:_res(f) for f in groups if not left[f] or f in failed}
+
+def _schedule(files, segs, hist):
+    "Units of work `(file, segment)`, those expected to take longest (or never timed) first"
+    units = [(f,s,hist.get(str(f), math.inf)/len(ss)) for f,ss in zip(files,segs) for s in ss]
+    return [(f,s) for f,s,_ in sorted(units, key=lambda o:-o[2])]
+
+# %% ../nbs/api/12_test.ipynb 16
+def _timings_path(): return cache_path('timings.jsonl')
+
+def _read_times(fn=None):
+    fn = fn or _timings_path()
+    return [json.loads(o) for o in fn.read_text().splitlines() if o] if fn.exists() else []
+
+def _record_times(res, fn=None, keep=50):
+    "Add the time taken by each notebook (and its cells) in `res` to the timings log `fn`, keeping `keep` runs per notebook"
+    fn = fn or _timings_path()
+    run = time.strftime('%Y-%m-%dT%H:%M:%S')
+    runs = _read_times(fn) + [dict(run=run, nb=str(f), passed=p, time=t, cells=ct) for f,(p,t,ct,_) in res.items()]
+    # Drop the oldest runs of notebooks with more than `keep`
+    left,kept = Counter(o['nb'] for o in runs),[]
+    for o in runs:
+        if left[o['nb']]<=keep: kept.append(o)
+        left[o['nb']] -= 1
+    tmp = fn.with_suffix('.tmp')
+    tmp.write_text(''.join(json.dumps(o)+'\n' for o in kept))
+    os.replace(tmp, fn)
+
+# %% ../nbs/api/12_test.ipynb 18
+def _queue_dirs(queue):
+    "The `todo`, `claimed` and `done` directories of work `queue`"
+    return [Path(queue)/o for o in ('todo','claimed','done')]
+
+def _write_json(fn, o):
+    "Write `o` to `fn` so that readers of `fn` never see it partly written"
+    tmp = fn.with_suffix('.tmp')
+    tmp.write_text(json.dumps(o))
+    os.replace(tmp, fn)
+
+def _withdraw(todo):
+    "Remove the tasks in `todo` no worker has claimed yet"
+    for fn in todo.glob('*.json'):
+        try: fn.unlink()
+        except FileNotFoundError: pass
+
+def _queue_fail(msg): return False,0,{},dict(cell=-1, traceback=msg)
+
+def _queue_run(queue, units, poll=0.5, timeout=300, stale=60, retries=2, **kwargs):
+    "Hand out `units` to `nbdev_test_worker`s through the `queue` directory, yielding `(index, result)` as each is done"
+    queue = Path(queue)
+    if (queue/'finished').exists(): (queue/'finished').unlink()
+    todo,claimed,done = _queue_dirs(queue)
+    for d in (todo,claimed,done):
+        shutil.rmtree(d, ignore_errors=True)
+        d.mkdir(parents=True)
+    root = get_config().config_path
+    for i,(f,s) in enumerate(units):
+        try: f = Path(f).relative_to(root)
+        except ValueError: pass
+        _write_json(todo/f'{i:05d}.json', dict(nb=str(f), segment=s, **kwargs))
+    seen,tries,last,beats = set(),Counter(),time.time(),{}
+    try:
+        while len(seen)<len(units):
+            for fn in sorted(done.glob('*.json')):
+                if fn.stem in seen: continue
+                seen.add(fn.stem)
+                last = time.time()
+                o = json.loads(fn.read_text())
+                yield int(fn.stem),(o['passed'],o['time'],o['cells'],o['failure'])
+            now = time.time()
+            # Workers touch the task they're running every `poll` seconds, so one which hasn't changed for `stale` seconds
+            # belongs to a worker that died. Its mtime is only compared with earlier ones, so other machines' clocks don't matter
+            for fn in claimed.iterdir():
+                stem,_,wid = fn.name.partition('.')
+                if stem in seen or (done/f'{stem}.json').exists(): continue
+                try: mtime = fn.stat().st_mtime
+                except FileNotFoundError: continue
+                if beats.get(fn.name, (None,))[0]!=mtime: beats[fn.name] = mtime,now
+                if now-beats[fn.name][1]<stale:
+                    last = now
+                    continue
+                tries[stem] += 1
+                if tries[stem]>retries:
+                    fn.unlink()
+                    seen.add(stem)
+                    yield int(stem),_queue_fail(f'Worker {wid} stopped while testing {units[int(stem)][0]} ({retries} retries)')
+                else:
+                    try: fn.rename(todo/f'{stem}.json')
+                    except FileNotFoundError: pass
+            if timeout and now-last>timeout:
+                _withdraw(todo)
+                for i in range(len(units)):
+                    if f'{i:05d}' not in seen: yield i,_queue_fail(f'No nbdev_test_worker ran {units[i][0]} within {timeout} secs')
+                return
+            time.sleep(poll)
+    except GeneratorExit:
+        # Stopped early, so withdraw the tasks no worker has claimed yet
+        _withdraw(todo)
+        raise
+    # Tells workers to exit
+    finally: (queue/'finished').touch()
+
+# %% ../nbs/api/12_test.ipynb 21
 @call_parse
 @delegates(nbglob_cli)
 def nbdev_test(
@@ -74,22 +304,65 @@ def nbdev_test(
     do_print:bool=False, # Print start and end of each notebook
     pause:float=0.01,  # Pause time (in seconds) between notebooks to avoid race conditions
     ignore_fname:str='.notest', # Filename that will result in siblings being ignored
+    no_cache:bool=False, # Run every notebook, rather than reusing results of unchanged notebooks that passed
+    split:bool=False, # Test segments of notebooks separated by `checkpoint` directives in parallel
+    queue:str=None, # Hand notebooks out to `nbdev_test_worker`s through this shared directory, instead of testing them here
+    queue_timeout:float=300, # Seconds to wait, with no `nbdev_test_worker` running, before failing the notebooks left in `queue`
+    queue_stale:float=60, # Seconds after which a notebook whose worker has stopped updating it is handed to another worker
+    queue_retries:int=2, # Times a notebook is handed to another worker before it's reported as failed
+    cell_timeout:float=None, # Seconds a cell may run for (default: `tst_cell_timeout` in settings.ini, or no limit)
+    nb_timeout:float=None, # Seconds a notebook may run for (default: `tst_nb_timeout` in settings.ini, or no limit)
+    max_rss:float=None, # MB of memory testing a notebook may use (default: `tst_max_rss` in settings.ini, or no limit)
+    changed_since:str=None, # Only test notebooks affected by changes since this git ref
+    preload:bool=False, # Import the library and `tst_preload` modules once, and fork a process from it for each notebook
+    results:str=None, # File to write the result of each notebook to as it finishes: JUnit if it ends in `.xml`, else JSON lines
+    fail_fast:bool=False, # Stop testing as soon as a notebook fails
+    max_failures:int=0, # Stop testing once this many notebooks have failed (0 for no limit)
     **kwargs):
     "Test in parallel notebooks matching `path`, passing along `flags`"
     skip_flags = get_config().tst_flags.split()
+    limits = dict(cell_timeout=cell_timeout, nb_timeout=nb_timeout, max_rss=max_rss)
+    limits = {k:float(ifnone(v, get_config().get('tst_'+k, 0))) for k,v in limits.items()}
     force_flags = flags.split()
     files = nbglob(path, as_path=True, **kwargs)
     files = [f.absolute() for f in sorted(files) if _keep_file(f, ignore_fname)]
     if len(files)==0: return print('No files were eligible for testing')
+    if changed_since:
+        files = _affected(files, _git_changed(changed_since))
+        if len(files)==0: return print(f'No notebooks were affected by changes since {changed_since}')
 
     if n_workers is None: n_workers = 0 if len(files)==1 else min(num_cpus(), 8)
     if IN_NOTEBOOK: kw = {'method':'spawn'} if os.name=='nt' else {'method':'forkserver'}
     else: kw = {}
+    if preload:
+        _preload()
+        if 'fork' in get_all_start_methods(): kw = {'method':'fork'}
     wd_pth = get_config().nbs_path
-    with working_directory(wd_pth if (wd_pth and wd_pth.exists()) else os.getcwd()):
-        results = parallel(test_nb, files, skip_flags=skip_flags, force_flags=force_flags, n_workers=n_workers,
-                           basepath=get_config().config_path, pause=pause, do_print=do_print, **kw)
-    passed,times = zip(*results)
+    # Keys are only needed to use and update the cache, and computing them reads each notebook and its library dependencies
+    keys = [None]*len(files) if no_cache else [_test_key(f, set(skip_flags)-set(force_flags)) for f in files]
+    cache = _read_test_cache()
+    todo = [i for i,k in enumerate(keys) if no_cache or k not in cache]
+    todo_fs = [files[i] for i in todo]
+    units = _schedule(todo_fs, [_test_segments(f) if split else [None] for f in todo_fs], _hist_times(cache))
+    out = _Results(results) if results else None
+    if out:
+        for i,k in enumerate(keys):
+            if not no_cache and k in cache: out.add(files[i], True, cache[k]['time'], {}, None, cached=True)
+    try:
+        with working_directory(wd_pth if (wd_pth and wd_pth.exists()) else os.getcwd()):
+            if queue: it = _queue_run(queue, units, timeout=queue_timeout, stale=queue_stale, retries=queue_retries,
+                                      skip_flags=skip_flags, force_flags=force_flags, **limits)
+            else: it = _run_units(units, n_workers=n_workers, pause=pause, skip_flags=skip_flags, force_flags=force_flags,
+                                  basepath=get_config().config_path, do_print=do_print, isolate=preload, **limits, **kw)
+            res = _collect(units, it, out, max_failures=1 if fail_fast else max_failures)
+    finally:
+        if out: out.close()
+    _record_times(res)
+    ran = [i for i in todo if files[i] in res]
+    if not no_cache: _write_test_cache(cache, [files[i] for i in ran], [keys[i] for i in ran], [res[files[i]][:2] for i in ran])
+    passed,times = zip(*[res[f][:2] if f in res else (True, cache.get(k, {}).get('time', 0)) for f,k in zip(files,keys)])
+    if len(todo)<len(files): print(f"{len(files)-len(todo)} notebooks passed from cache, {len(todo)} executed.")
+    if len(ran)<len(todo): print(f"Stopped early after failures: {len(todo)-len(ran)} notebooks were not finished.")
     if all(passed): print("Success.")
     else: 
         _fence = '='*50
@@ -98,3 +371,219 @@ def nbdev_test(
         sys.exit(1)
     if timing:
         for i,t in sorted(enumerate(times), key=lambda o:o[1], reverse=True): print(f"{files[i].name}: {int(t)} secs")
+
+# %% ../nbs/api/12_test.ipynb 26
+_re_ansi = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
+def _nb_result(fn, passed, t, cells, failure, cached=False):
+    "Result of testing notebook `fn`, as a `dict` ready to be reported"
+    fcell = failure['cell'] if failure else None
+    cells = [dict(idx=int(i), time=ct, status='failed' if int(i)==fcell else 'passed')
+             for i,ct in sorted(cells.items(), key=lambda o:int(o[0]))]
+    status = 'cached' if cached else 'passed' if passed else 'failed'
+    return dict(nb=str(fn), status=status, time=t, cells=cells, error=_re_ansi.sub('', failure['traceback']) if failure else None)
+
+class _Results:
+    "Write the result of each notebook to `fn` as it's added: as JUnit XML if `fn` ends in `.xml`, otherwise as JSON lines"
+    def __init__(self, fn):
+        self.junit = str(fn).endswith('.xml')
+        self.f = sys.stdout if fn=='-' else open(fn, 'w')
+        if self.junit: self._write('<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n')
+
+    def _write(self, s):
+        self.f.write(s)
+        self.f.flush()
+
+    def add(self, fn, *args, **kwargs):
+        r = _nb_result(fn, *args, **kwargs)
+        self._write(self._junit(r) if self.junit else json.dumps(r)+'\n')
+
+    def _junit(self, r):
+        from xml.sax.saxutils import escape, quoteattr
+        name = quoteattr(Path(r['nb']).name)
+        res = [f'<testsuite name={name} tests="{len(r["cells"]) or 1}" failures="{int(r["status"]=="failed")}" time="{r["time"]:.3f}">']
+        for c in r['cells']:
+            # Numbered from 1, like the "While Executing Cell #" of tracebacks
+            err = f'<failure message="Cell {c["idx"]+1} failed">{escape(r["error"])}</failure>' if c['status']=='failed' else ''
+            res.append(f'  <testcase classname={name} name="cell {c["idx"]+1}" time="{c["time"]:.3f}">{err}</testcase>')
+        if not r['cells']:
+            inner = {'cached': '<skipped message="Unchanged since it last passed"/>',
+                     'failed': f'<failure message="Notebook failed">{escape(r["error"] or "")}</failure>'}.get(r['status'], '')
+            res.append(f'  <testcase classname={name} name="notebook" time="{r["time"]:.3f}">{inner}</testcase>')
+        return '\n'.join(res+['</testsuite>\n'])
+
+    def close(self):
+        if self.junit: self._write('</testsuites>\n')
+        if self.f is not sys.stdout: self.f.close()
+
+# %% ../nbs/api/12_test.ipynb 33
+def _rss_mb(pid):
+    "Resident memory of process `pid` in MB, or 0 if it can't be found (i.e. other than on Linux)"
+    try: return int(Path(f'/proc/{pid}/statm').read_text().split()[1])*os.sysconf('SC_PAGE_SIZE')/2**20
+    except (OSError, ValueError, AttributeError): return 0
+
+def _limit_msg(fn, idx, err):
+    "Report that cell `idx` of notebook `fn` was stopped because of `err`, like `CaptureShell.prettytb`"
+    src = read_nb(fn).cells[idx].source if idx>=0 else ''
+    return f"LimitExceeded in {fn}:\n{'='*75}\n\nWhile Executing Cell #{idx+1}:\n{err}\n{src}\n"
+
+def _limited_child(send, cell, fn, **kwargs):
+    def _on_cell(c): cell[:] = [c.idx_, time.time()]
+    cell_times,failure = {},{}
+    send.send((*test_nb(fn, cell_times=cell_times, on_cell=_on_cell, failure=failure, **kwargs), cell_times, failure or None))
+
+def _test_nb_limited(fn, # file name of notebook to test
+                     cell_timeout=0, # seconds each cell may run for
+                     nb_timeout=0, # seconds the whole notebook may run for
+                     max_rss=0, # MB of memory the process testing the notebook may use
+                     showerr=True, # print errors to stderr?
+                     poll=0.1, # seconds between checks of the limits
+                     **kwargs):
+    "Run `test_nb` in a new process, killing it if the notebook goes over its time or memory limits"
+    ctx = get_context('fork' if 'fork' in get_all_start_methods() else 'spawn')
+    cell = ctx.Array('d', [-1,0])
+    recv,send = ctx.Pipe(False)
+    p = ctx.Process(target=_limited_child, args=(send, cell, fn), kwargs=dict(showerr=showerr, **kwargs))
+    start = time.time()
+    p.start()
+    err = None
+    while err is None and not recv.poll(poll):
+        idx,cell_start = cell[:]
+        now = time.time()
+        if not p.is_alive() and not recv.poll(): err = f'Process exited with code {p.exitcode}'
+        elif nb_timeout and now-start>nb_timeout: err = f'Notebook ran for more than {nb_timeout} secs'
+        elif cell_timeout and idx>=0 and now-cell_start>cell_timeout: err = f'Cell ran for more than {cell_timeout} secs'
+        elif max_rss and _rss_mb(p.pid)>max_rss: err = f'Process used more than {max_rss} MB'
+    if err is None: res = recv.recv()
+    else:
+        p.kill()
+        idx = int(cell[0])
+        msg = _limit_msg(fn, idx, err)
+        if showerr: sys.stderr.write(msg)
+        res = False,time.time()-start,{},dict(cell=idx, traceback=msg)
+    p.join()
+    return res
+
+# %% ../nbs/api/12_test.ipynb 37
+def _preload():
+    "Import each module of the library listed in `_modidx.py`, and the modules in `tst_preload` in settings.ini"
+    cfg = get_config()
+    if str(cfg.config_path) not in sys.path: sys.path.insert(0, str(cfg.config_path))
+    idx = cfg.lib_path/'_modidx.py'
+    mods = list(exec_local(idx.read_text(), 'd')['syms']) if idx.exists() else [cfg.lib_path.name]
+    for m in ['execnb.shell'] + mods + cfg.get('tst_preload', '').split():
+        try: importlib.import_module(m)
+        except Exception as e: warn(f'Could not preload {m}: {e}')
+
+# %% ../nbs/api/12_test.ipynb 41
+def _git_changed(ref):
+    "Files changed since git `ref`, including uncommitted and untracked files"
+    code,root = run('git rev-parse --show-toplevel', ignore_ex=True)
+    if code: raise ValueError("Can't find changed files, since this isn't a git repository")
+    # Run from the top level, since `ls-files` only lists files below the working directory
+    git = ['git', '-C', root]
+    code,_ = run(*git, 'rev-parse', '--verify', '--quiet', f'{ref}^{{commit}}', ignore_ex=True)
+    if code: raise ValueError(f'--changed_since: {ref!r} is not a git commit, branch or tag')
+    fs = run(*git, 'diff', '--name-only', ref, '--').splitlines() + run(*git, 'ls-files', '--others', '--exclude-standard').splitlines()
+    return {(Path(root)/f).resolve() for f in fs}
+
+def _mod_srcs(lib_path=None):
+    "Notebooks exported to each library module listed in `_modidx.py`"
+    lib_path = Path(lib_path or get_config().lib_path).absolute()
+    idx = exec_local((lib_path/'_modidx.py').read_text(), 'd')['syms']
+    fs = [_lib_file(m, lib_path) for m in idx]
+    return {f.resolve():{c.nb_path for c in _iter_py_cells(f) if c.nb_path} for f in fs if f}
+
+def _affected(files, changed, lib_path=None):
+    "Notebooks in `files` which depend on any of the `changed` files"
+    if get_config().config_file.resolve() in changed: return files
+    srcs = _mod_srcs(lib_path)
+    dirty = {f for f,nbs in srcs.items() if f in changed or nbs & changed}
+    srcs = set().union(*[srcs[f] for f in dirty])
+    def _dep(fn):
+        fn = Path(fn).resolve()
+        if fn in changed or fn in srcs: return True
+        deps = _lib_deps(L(read_nb_lazy(fn).cells).map(cell_ast).concat(), lib_path)
+        return any(f.resolve() in dirty for f in deps)
+    return [f for f in files if _dep(f)]
+
+# %% ../nbs/api/12_test.ipynb 46
+def _cell_growth(prev, last):
+    "Increase in time of each cell in run `last` over its median time in runs `prev`, largest first"
+    res = {}
+    for c,t in last['cells'].items():
+        ts = [o['cells'][c] for o in prev if c in o.get('cells', {})]
+        if ts: res[c] = t-median(ts)
+    return sorted(res.items(), key=lambda o:-o[1])
+
+def _timing_report(runs, threshold=0.25, window=10, min_secs=1.):
+    "Notebooks whose latest passing run in `runs` took `threshold` longer than the median of the `window` before it"
+    res = []
+    for nb,rs in groupby([o for o in runs if o['passed']], itemgetter('nb')).items():
+        if len(rs)<2 or rs[-1]['time']<min_secs: continue
+        prev,last = rs[-window-1:-1],rs[-1]
+        base = median(o['time'] for o in prev)
+        if last['time'] <= base*(1+threshold): continue
+        res.append(AttrDict(nb=nb, time=last['time'], base=base, trend=[o['time'] for o in prev+[last]],
+                            cells=_cell_growth(prev, last)))
+    return sorted(res, key=lambda o:o.base-o.time)
+
+# %% ../nbs/api/12_test.ipynb 48
+@call_parse
+def nbdev_test_report(
+    threshold:float=0.25, # Report notebooks at least this fraction slower than their recent median
+    window:int=10, # Number of previous runs to compare the latest run against
+    min_secs:float=1., # Ignore notebooks taking less than this many seconds
+    n_cells:int=3): # Number of slowest-growing cells to show for each notebook
+    "Report notebooks whose latest test run was slower than in the past, based on the `nbdev_test` timing history"
+    runs = _read_times()
+    if not runs: return print('No timings recorded yet: run `nbdev_test` first')
+    res = _timing_report(runs, threshold=threshold, window=window, min_secs=min_secs)
+    if not res: return print('No timing regressions found.')
+    for o in res:
+        print(f"{Path(o.nb).name}: {o.time:.1f} secs, {o.time/o.base-1:+.0%} vs median {o.base:.1f} secs")
+        print('  trend: ' + ' '.join(f'{t:.1f}' for t in o.trend))
+        for c,t in o.cells[:n_cells]: print(f'  cell {c}: {t:+.1f} secs')
+
+# %% ../nbs/api/12_test.ipynb 51
+@call_parse
+def nbdev_test_worker(
+    queue:str, # Directory shared with `nbdev_test --queue`
+    poll:float=0.5, # Seconds to wait between checks for new tasks, and between updates of the task being run
+    preload:bool=False, # Import the library and `tst_preload` modules once, and fork a process from it for each notebook
+    do_print:bool=False): # Print start and end of each notebook
+    "Test notebooks handed out through `queue` by `nbdev_test`, until it has the results of them all"
+    todo,claimed,done = _queue_dirs(queue)
+    wid = f'{socket.gethostname()}-{os.getpid()}'
+    cfg = get_config()
+    wd_pth = cfg.nbs_path
+    if preload: _preload()
+    # Touch the task being run every `poll` seconds, so `nbdev_test` can tell if this worker dies
+    cur,stop = [None],threading.Event()
+    def _beat():
+        while not stop.wait(poll):
+            try: cur[0] and os.utime(cur[0])
+            except OSError: pass
+    threading.Thread(target=_beat, daemon=True).start()
+    try:
+        with working_directory(wd_pth if (wd_pth and wd_pth.exists()) else os.getcwd()):
+            while True:
+                # Even once `todo` is empty, tasks of workers which die are put back in it until `nbdev_test` finishes
+                if (Path(queue)/'finished').exists(): break
+                tasks = sorted(todo.glob('*.json')) if todo.exists() else []
+                for fn in tasks:
+                    task = claimed/f'{fn.stem}.{wid}'
+                    try: fn.rename(task)
+                    except FileNotFoundError: continue
+                    cur[0] = task
+                    o = json.loads(task.read_text())
+                    try: passed,t,cells,failure = _test_unit((cfg.config_path/o.pop('nb'), o.pop('segment')),
+                                                             basepath=cfg.config_path, do_print=do_print, isolate=preload, **o)
+                    except Exception:
+                        traceback.print_exc()
+                        passed,t,cells,failure = False,0,{},dict(cell=-1, traceback=traceback.format_exc())
+                    _write_json(done/f'{fn.stem}.json', dict(passed=passed, time=t, cells=cells, failure=failure, worker=wid))
+                    cur[0] = None
+                    break
+                else: time.sleep(poll)
+    finally: stop.set()